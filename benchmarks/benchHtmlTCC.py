@@ -0,0 +1,104 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Compara o tempo de leitura da página de TCCs do portal pelo leitor de tabela (linhasTCC) e pela versão
+    anterior, baseada em BeautifulSoup. Os links não são encurtados.
+
+    Uso, a partir da pasta do projeto:
+    $ python benchmarks/benchHtmlTCC.py                          # Página sintética com 5000 TCCs
+    $ python benchmarks/benchHtmlTCC.py --arquivo comunica.html   # Página salva do portal
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from benchmarks.paginaPortal import gerarPagina
+from lib.interpretadorDados import linhasTCC
+
+
+def htmlTCCBeautifulSoup(html_content):
+    """
+    Leitura da página com BeautifulSoup, como era feita em htmlTCC, sem o encurtamento dos links.
+    """
+    soup = BeautifulSoup(html_content, 'lxml')
+    linhas = []
+
+    if(len(soup.find_all('tr')) <= 2):
+            return []
+
+    for rows in soup.find_all('tr'):
+
+        cols = rows.find_all('td')
+        if(len(cols) == 0):
+            continue # pula o cabeçalho
+
+        dados = {
+            'Curso': cols[2].text,
+            'Aluno': cols[3].text,
+            'Orientador': cols[4].text,
+            'Coorientador': cols[5].text,
+            'Titulo': cols[6].text,
+            'Banca': re.split(r' ?- ', cols[7].text.strip())[1:],
+            'Data': re.search(r'\d{2}\/\d{2}\/\d{4}', cols[0].text)[0],
+            'Hora': re.search(r'\d{2}:\d{2}', cols[0].text)[0]
+        }
+
+        if(cols[1].text.startswith('REMOTO:')):
+            dados['Local'] = cols[1].find('a')['href']
+        else:
+            dados['Local'] = cols[1].text.split(':')[1]
+
+        linhas.append(dados)
+
+    return linhas
+
+
+def medir(funcao, conteudo, repeticoes:int):
+    """
+    Retorna o menor tempo, em segundos, entre as repetições, e o resultado da função.
+    """
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(conteudo)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara a leitura da página de TCCs do portal.')
+    parser.add_argument('--arquivo', help='Página do portal salva (comunica.php). Padrão: página sintética.')
+    parser.add_argument('--linhas', type=int, default=5000, help='Número de TCCs da página sintética.')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.arquivo:
+        with open(args.arquivo, 'r', encoding='utf-8') as f:
+            conteudo = f.read()
+    else:
+        conteudo = gerarPagina(args.linhas)
+
+    tempoSoup, esperado = medir(htmlTCCBeautifulSoup, conteudo, args.repeticoes)
+    tempoLeitor, obtido = medir(lambda c: list(linhasTCC(c)), conteudo, args.repeticoes)
+
+    if obtido != esperado:
+        print('Os resultados são diferentes!')
+        return 1
+
+    print(f'Página: {len(conteudo) / 1024:.0f} KiB, {len(obtido)} TCCs')
+    print(f'BeautifulSoup: {tempoSoup * 1000:8.1f} ms')
+    print(f'linhasTCC:     {tempoLeitor * 1000:8.1f} ms ({tempoSoup / tempoLeitor:.1f}x)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
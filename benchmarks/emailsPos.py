@@ -0,0 +1,91 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Emails sintéticos de divulgação de defesas da pós-graduação, no formato lido por interpretadorDados.emailPos,
+    para medir e testar a leitura sem os emails reais.
+"""
+
+import random
+
+from benchmarks.paginaPortal import NOMES, PALAVRAS, SOBRENOMES
+
+
+def _nome(rng, titulo=''):
+    partes = [rng.choice(NOMES)] + rng.sample(SOBRENOMES, rng.randint(1, 3))
+    return (titulo + ' ' if titulo else '') + ' '.join(partes)
+
+
+def emailDefesa(semente:int = 0, coorientador:bool = None, local:str = None):
+    """
+    Gera o texto de um email de divulgação de defesa, com assinatura e texto de rodapé como nos emails reais.
+
+    Args:
+        semente (int): A semente do gerador, para emails reproduzíveis.
+        coorientador (bool, optional): Se o email tem coorientador. Padrão: sorteado.
+        local (str, optional): O texto do campo Local. Padrão: sala, link ou os dois, sorteados.
+
+    Returns:
+        str: O conteúdo do email.
+    """
+    rng = random.Random(semente)
+    if coorientador is None:
+        coorientador = rng.random() < 0.4
+    if local is None:
+        sala = f'Sala {rng.randint(100, 299)} do Prédio 4342{rng.randint(4, 5)} (Campus do Vale)'
+        link = f'https://mconf.ufrgs.br/webconf/{rng.randint(0, 99999):05d}'
+        local = rng.choice([sala, link + '.', f'{sala} e {link}'])
+
+    tipo = rng.choice(['MESTRADO', 'DOUTORADO'])
+    linhas = [
+        'Prezados(as),',
+        '',
+        'Divulgamos a seguinte defesa:',
+        '',
+        f'DEFESA DE {tipo}',
+        '',
+        f'Aluno(a): {_nome(rng).upper()}',
+        f'Orientador(a): {_nome(rng, "Prof. Dr.")}',
+    ]
+    if coorientador:
+        linhas.append(f'Coorientador(a): {_nome(rng, "Profa. Dra.")}')
+    linhas += [
+        f'Título: {" ".join(rng.choice(PALAVRAS) for _ in range(rng.randint(6, 20))).capitalize()}',
+        'Linha de Pesquisa: Sistemas de Computação',
+        f'Data: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025',
+        f'Horário: {rng.randint(8, 18)}h{rng.choice(["00", "30"])}',
+        f'Local: {local}',
+        '',
+        'Banca Examinadora:',
+    ]
+    linhas += [f'- {_nome(rng, "Prof. Dr.")} (UFRGS)' for _ in range(rng.randint(3, 5))]
+    linhas += [
+        '',
+        'Resumo: ' + ' '.join(rng.choice(PALAVRAS) for _ in range(rng.randint(80, 200))) + '.',
+        '',
+        'Atenciosamente,',
+        'Secretaria do PPGC',
+        'Instituto de Informática - UFRGS',
+    ]
+    return '\n'.join(linhas) + '\n'
+
+
+def emailAdverso(tamanho:int = 20000, semente:int = 0):
+    """
+    Gera um email que parece uma divulgação de defesa mas não tem o campo Local, com um resumo longo e
+    muitas linhas que começam com os nomes dos campos. É o pior caso para uma leitura que volta atrás a
+    cada campo não encontrado.
+
+    Args:
+        tamanho (int): O tamanho aproximado do texto, em caracteres.
+        semente (int): A semente do gerador.
+    """
+    rng = random.Random(semente)
+    texto = emailDefesa(semente, local='').replace('Local: \n', '')
+    ruido = []
+    while len(texto) + sum(map(len, ruido)) < tamanho:
+        campo = rng.choice(['Aluno(a)', 'Orientador(a)', 'Título', 'Data', 'Horário', 'Observação'])
+        ruido.append(f'{campo} ' + ' '.join(rng.choice(PALAVRAS) for _ in range(rng.randint(3, 15))))
+    return texto + '\n'.join(ruido) + '\n'
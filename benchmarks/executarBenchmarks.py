@@ -0,0 +1,258 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Mede os caminhos mais usados do projeto com dados sintéticos e reproduzíveis: o desenho de texto, a renderização
+    de cada modelo, a leitura da página do portal e dos emails da pós, a mescla dos TCCs no banco e a geração do
+    calendário. Os links são encurtados no modo offline e o banco e o cache de aliases ficam em uma pasta temporária.
+
+    Os resultados são gravados em JSON, junto com os contadores do registro de fontes de cada caso (acertos, falhas
+    e descartes), que começa vazio em cada caso. Com --referencia, cada caso é comparado com uma execução anterior e a
+    execução falha se a mediana de algum caso piorar mais que o limite.
+
+    Uso, a partir da pasta do projeto:
+    $ python benchmarks/executarBenchmarks.py --saida base.json
+    $ python benchmarks/executarBenchmarks.py --referencia base.json --limite 0.2
+    $ python benchmarks/executarBenchmarks.py --casos 'renderizar/*' 'htmlTCC/*'
+"""
+
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import functools
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from PIL import Image, ImageDraw
+
+from benchmarks.emailsPos import emailAdverso, emailDefesa
+from benchmarks.paginaPortal import gerarLinhas, gerarPagina
+import lib.encurtador_tinyURL as encurtador
+from lib.bancoTCCs import abrirBanco, mesclarBanco, salvarTCCs
+from lib.gerarCalendariosCSV import gerarCalendarioEventos
+from lib.interpretadorDados import emailPos, htmlTCC
+from lib.layout import renderizarModelo
+from lib.pos import imagemFeed as posFeed, imagemTotem as posTotem
+from lib.tcc import imagemFeed as tccFeed, imagemStories as tccStories
+from lib.utils import drawText, getFont, registroFontes, textBox
+
+TITULO_CURTO = 'Compiladores'
+TITULO_LONGO = ('Uma abordagem baseada em aprendizado profundo para detecção de anomalias em séries temporais de sistemas '
+                'embarcados críticos com restrições de energia e requisitos de tempo real')
+
+
+def _tccs(quantidade:int, semente:int = 0):
+    """
+    TCCs sintéticos no formato de data/TCCs.json.
+    """
+    tccs = []
+    for linha in gerarLinhas(quantidade, semente):
+        linha = dict(linha)
+        linha['Local'] = linha.pop('Link', None) or linha.pop('Sala')
+        tccs.append(linha)
+    return tccs
+
+
+def _prepararTextBox(texto:str):
+    img = Image.new('RGB', (1080, 400), (255, 255, 255))
+    d = ImageDraw.Draw(img)
+    fonte = getFont('JosefinSans/Bold.ttf', 25)
+    return lambda: textBox(texto, d, fonte, (60, 20, 900, 360), spacing=-1, fill=(0, 0, 0))
+
+
+def _prepararDrawText(texto:str):
+    img = Image.new('RGB', (4000, 80), (255, 255, 255))
+    d = ImageDraw.Draw(img)
+    fonte = getFont('JosefinSans/Regular.ttf', 27)
+    return lambda: drawText(d, texto, (10, 20), fonte, -1, fill=(0, 0, 0))
+
+
+def _prepararRenderizar(modelo:str):
+    tccs = _tccs(4, semente=7)
+    tccs[0]['Titulo'] = TITULO_LONGO
+    pos = dict(tccs[0], Local='Sala 215 Prédio 43425\nhttps://tinyurl.com/defesa-x')
+
+    if modelo == 'TCC_feed':
+        return lambda: renderizarModelo(tccFeed.MODELO, tccs[:2])
+    if modelo == 'TCC_stories':
+        return lambda: renderizarModelo(tccStories.MODELO, tccs, {'Curso': tccs[0]['Curso'], 'semestre': '2025/1'})
+    if modelo == 'POS_feed':
+        return lambda: renderizarModelo(posFeed.MODELO, [pos], {'tituloCard': 'Defesa de Dissertação'})
+    return lambda: renderizarModelo(posTotem.MODELO, [pos], {'tituloCard': 'Defesa de Tese'})
+
+
+def _prepararHtmlTCC(quantidade:int):
+    pagina = gerarPagina(quantidade)
+    return lambda: htmlTCC(pagina)
+
+
+def _prepararEmailPos(tipo:str):
+    if tipo == 'real':
+        emails = [emailDefesa(semente) for semente in range(20)]
+        return lambda: [emailPos(email) for email in emails]
+
+    email = emailAdverso(20000)
+    def executar():
+        try:
+            emailPos(email)
+        except ValueError:
+            pass
+    return executar
+
+
+def _prepararMesclar(historico:int, pasta:str):
+    """
+    Banco com o histórico de TCCs e a página do semestre atual (os últimos 300 TCCs), com os títulos alternados a
+    cada repetição, de modo que toda mescla tenha alterações para gravar.
+    """
+    tccs = _tccs(historico)
+    con = abrirBanco(os.path.join(pasta, f'mesclar-{historico}.db'), origem=None)
+    salvarTCCs(con, tccs)
+
+    versoes = [tccs[-300:], [dict(tcc, Titulo=tcc['Titulo'] + ' (versão final)') for tcc in tccs[-300:]]]
+    repeticao = [0]
+    def executar():
+        repeticao[0] += 1
+        mesclarBanco(con, versoes[repeticao[0] % 2])
+    return executar
+
+
+def _prepararCalendario(quantidade:int, pasta:str):
+    tccs = _tccs(quantidade)
+    nome = f'benchmark-{os.getpid()}'
+    def executar():
+        gerarCalendarioEventos(tccs, nome)
+        os.remove(f'./output/calendario/calendario-{nome}.csv')
+    return executar
+
+
+# Casos de medição: {nome: função que recebe a pasta temporária e prepara a função medida}
+CASOS = {
+    'textBox/curto': lambda pasta: _prepararTextBox(TITULO_CURTO),
+    'textBox/longo': lambda pasta: _prepararTextBox(TITULO_LONGO),
+    'drawText/curto': lambda pasta: _prepararDrawText(TITULO_CURTO),
+    'drawText/longo': lambda pasta: _prepararDrawText(TITULO_LONGO),
+    'renderizar/TCC_feed': lambda pasta: _prepararRenderizar('TCC_feed'),
+    'renderizar/TCC_stories': lambda pasta: _prepararRenderizar('TCC_stories'),
+    'renderizar/POS_feed': lambda pasta: _prepararRenderizar('POS_feed'),
+    'renderizar/POS_totem': lambda pasta: _prepararRenderizar('POS_totem'),
+    'htmlTCC/100': lambda pasta: _prepararHtmlTCC(100),
+    'htmlTCC/1000': lambda pasta: _prepararHtmlTCC(1000),
+    'htmlTCC/10000': lambda pasta: _prepararHtmlTCC(10000),
+    'emailPos/real': lambda pasta: _prepararEmailPos('real'),
+    'emailPos/adverso': lambda pasta: _prepararEmailPos('adverso'),
+    'mesclar/1000': functools.partial(_prepararMesclar, 1000),
+    'mesclar/10000': functools.partial(_prepararMesclar, 10000),
+    'mesclar/50000': functools.partial(_prepararMesclar, 50000),
+    'calendario/1000': functools.partial(_prepararCalendario, 1000),
+}
+
+
+def medir(funcao, repeticoes:int):
+    """
+    Executa a função uma vez, com os caches ainda vazios, e depois o número de repetições.
+
+    Returns:
+        dict: Os tempos em segundos: 'primeira', 'melhor' e 'mediana' (das repetições).
+    """
+    tempos = []
+    for _ in range(repeticoes + 1):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {'primeira': tempos[0], 'melhor': min(tempos[1:]), 'mediana': statistics.median(tempos[1:])}
+
+
+def compararResultados(resultados:dict, referencia:dict, limite:float):
+    """
+    Compara a mediana de cada caso com a da referência.
+
+    Returns:
+        list: Os casos que pioraram mais que o limite, como (nome, razão).
+    """
+    regressoes = []
+    for nome, tempos in resultados.items():
+        anterior = referencia.get(nome)
+        if anterior is None:
+            continue
+        razao = tempos['mediana'] / anterior['mediana']
+        if razao > 1 + limite:
+            regressoes.append((nome, razao))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede os caminhos mais usados do projeto.')
+    parser.add_argument('--casos', nargs='*', default=['*'], help='Padrões dos casos a medir, como "htmlTCC/*". Padrão: todos.')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', default='benchmarks/resultados.json', help='Arquivo JSON com os resultados.')
+    parser.add_argument('--referencia', help='Resultados anteriores, para detectar regressões.')
+    parser.add_argument('--limite', type=float, default=0.25, help='Piora máxima aceita da mediana, em fração. Padrão: 0.25.')
+    parser.add_argument('--listar', action='store_true', help='Lista os casos e sai.')
+    args = parser.parse_args()
+
+    nomes = [nome for nome in CASOS if any(fnmatch.fnmatch(nome, padrao) for padrao in args.casos)]
+    if args.listar:
+        print('\n'.join(nomes))
+        return 0
+    if not nomes:
+        parser.error('Nenhum caso corresponde aos padrões informados')
+
+    referencia = {}
+    if args.referencia:
+        with open(args.referencia, 'r', encoding='utf-8') as f:
+            referencia = json.load(f)['resultados']
+
+    # Os modelos e as fontes são lidos relativos à pasta do projeto
+    saida = os.path.abspath(args.saida)
+    os.chdir(RAIZ)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        encurtador.configurar(offline=True)
+        encurtador.CACHE = os.path.join(pasta, 'url-aliases-cache.json')
+
+        for nome in nomes:
+            registroFontes.limpar()
+            # Algumas funções medidas imprimem mensagens; elas não fazem parte do relatório
+            with contextlib.redirect_stdout(io.StringIO()):
+                resultados[nome] = medir(CASOS[nome](pasta), args.repeticoes)
+            resultados[nome]['fontes'] = registroFontes.estatisticas()
+
+            tempos = resultados[nome]
+            comparacao = ''
+            if nome in referencia:
+                comparacao = f'  {tempos["mediana"] / referencia[nome]["mediana"]:5.2f}x da referência'
+            fontes = tempos['fontes']
+            print(f'{nome:24} mediana {tempos["mediana"] * 1000:9.2f} ms  melhor {tempos["melhor"] * 1000:9.2f} ms  '
+                  f'primeira {tempos["primeira"] * 1000:9.2f} ms  fontes {fontes["acertos"]}/{fontes["falhas"]}/{fontes["descartes"]}{comparacao}')
+
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump({
+            'data': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'repeticoes': args.repeticoes,
+            'resultados': resultados,
+        }, f, indent=4)
+    print(f'\nResultados salvos em {saida}')
+
+    regressoes = compararResultados(resultados, referencia, args.limite)
+    for nome, razao in regressoes:
+        print(f'Regressão em {nome}: {razao:.2f}x da referência (limite {1 + args.limite:.2f}x)')
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
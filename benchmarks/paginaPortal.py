@@ -0,0 +1,107 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Geração de páginas sintéticas no formato da página "Visão do Comunica - TCCs" (comunica.php) do portal do INF,
+    para medir e testar a importação sem acesso ao portal.
+"""
+
+import datetime
+import html
+import random
+
+NOMES = ['João', 'Maria', 'Ana', 'José', 'Érica', 'Ígor', 'Luísa', 'Conceição', 'André', 'Fábio', 'Pedro', 'Júlia', 'Cauã', 'Letícia']
+SOBRENOMES = ['Silva', 'Souza', 'Müller', 'Gonçalves', 'Araújo', 'Ávila', 'de Oliveira', 'dos Santos', 'Lima', 'Peçanha', 'Brandão', 'Schütz']
+PALAVRAS = ['Análise', 'de', 'sistemas', 'distribuídos', 'aprendizado', 'profundo', 'otimização', 'redes', 'em', 'compiladores',
+            'visão', 'computacional', 'para', 'segurança', 'energia', 'e', 'desempenho', 'sobre', 'grafos', 'robótica']
+CURSOS = ['Engenharia de Computação', 'Ciência da Computação']
+
+_CABECALHO = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Visão do Comunica - TCCs</title>
+<link rel="stylesheet" href="/portal/css/estilo.css">
+<script>var usuario = "comunica"; function ordenar(c) { return c < 2; }</script>
+</head>
+<body>
+<div id="menu"><ul><li><a href="/portal/painel.php">Painel</a></li><li><a href="/portal/sair.php">Sair</a></li></ul></div>
+<h1>TCCs - Apresentações</h1>
+<table class="tabela" border="1">
+<tr><th>Data</th><th>Local</th><th>Curso</th><th>Aluno</th><th>Orientador</th><th>Coorientador</th><th>Título</th><th>Banca</th></tr>
+"""
+
+_RODAPE = """</table>
+<p class="rodape">Instituto de Informática &mdash; UFRGS</p>
+</body>
+</html>
+"""
+
+
+def _nome(rng, titulo=''):
+    partes = [rng.choice(NOMES)] + rng.sample(SOBRENOMES, rng.randint(1, 3))
+    return (titulo + ' ' if titulo else '') + ' '.join(partes)
+
+
+def gerarLinhas(quantidade:int, semente:int = 0, inicio:datetime.date = datetime.date(2024, 3, 1)):
+    """
+    Gera os dados das linhas da tabela.
+
+    Args:
+        quantidade (int): O número de TCCs.
+        semente (int): A semente do gerador, para páginas reproduzíveis.
+        inicio (datetime.date): A data da primeira defesa.
+
+    Returns:
+        list: Um dicionário por TCC, com os campos de htmlTCC, o link original em 'Link' e o local em 'Sala'.
+    """
+    rng = random.Random(semente)
+    linhas = []
+    for i in range(quantidade):
+        data = inicio + datetime.timedelta(days=i * 700 // max(quantidade, 1))
+        remoto = rng.random() < 0.5
+        linha = {
+            'Curso': rng.choice(CURSOS),
+            'Aluno': _nome(rng) + f' {i}',
+            'Orientador': _nome(rng, 'Prof.'),
+            'Coorientador': _nome(rng, 'Dr.') if rng.random() < 0.3 else '',
+            'Titulo': ' '.join(rng.choice(PALAVRAS) for _ in range(rng.randint(4, 18))).capitalize(),
+            'Banca': [_nome(rng, 'Prof.') for _ in range(rng.randint(2, 4))],
+            'Data': data.strftime('%d/%m/%Y'),
+            'Hora': f'{rng.randint(8, 18):02d}:{rng.choice([0, 30]):02d}',
+        }
+        if remoto:
+            linha['Link'] = (f'https://tinyurl.com/defesa-{i}' if rng.random() < 0.3 else
+                             f'https://mconf.ufrgs.br/webconf/{i:05d}?sala=tcc&amp=1')
+        else:
+            linha['Sala'] = f' Sala {rng.randint(100, 299)} Prédio {rng.choice(["43424", "43425", "43412"])}'
+        linhas.append(linha)
+    return linhas
+
+
+def linhaHTML(linha:dict):
+    """
+    Formata uma linha no HTML da tabela do portal.
+    """
+    e = html.escape
+    if 'Link' in linha:
+        local = f'REMOTO: <a href="{e(linha["Link"])}" target="_blank">{e(linha["Link"])}</a>'
+    else:
+        local = f'PRESENCIAL:{e(linha["Sala"])}'
+    banca = ''.join(f' - {e(membro)}' for membro in linha['Banca'])
+    return (f'<tr class="linha">\n<td>{linha["Data"]}<br>{linha["Hora"]}</td>\n<td>{local}</td>\n<td>{e(linha["Curso"])}</td>'
+            f'<td>{e(linha["Aluno"])}</td><td>{e(linha["Orientador"])}</td><td>{e(linha["Coorientador"])}</td>'
+            f'<td><b>{e(linha["Titulo"])}</b></td><td>{banca}</td>\n</tr>\n')
+
+
+def gerarPagina(quantidade:int, semente:int = 0):
+    """
+    Gera o HTML de uma página do portal com a quantidade de TCCs informada.
+
+    Exemplo:
+    >>> len(htmlTCC(gerarPagina(1000)))
+    1000
+    """
+    return _CABECALHO + ''.join(linhaHTML(linha) for linha in gerarLinhas(quantidade, semente)) + _RODAPE
@@ -0,0 +1,220 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Servidor local que imita o portal de serviços do INF para a importação de TCCs (lib/obterNovosTCCs.py): o login
+    em valida.php, o redirecionamento para login.php sem sessão válida e a página comunica.php, gerada por
+    benchmarks/paginaPortal.py com a quantidade de TCCs desejada.
+
+    Uso, a partir da pasta do projeto:
+    $ python benchmarks/servidorPortal.py --porta 8765 --tccs 20000
+    $ PORTAL_INF=http://127.0.0.1:8765/portal TINYURL_OFFLINE=1 python gerarImagensTCC_GUI.py   # Botão de importar TCCs
+
+    Ou, dentro de um script:
+    >>> with ServidorPortal(quantidade=5000) as servidor:
+    ...     obterNovosTCCs.PORTAL = servidor.portal
+    ...     obterNovosTCCs.obterNovosTCCs()
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.paginaPortal import gerarPagina
+
+
+class _Requisicao(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, codigo:int, corpo:bytes = b'', cabecalhos:dict = {}):
+        self.send_response(codigo)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _redirecionar(self, caminho:str, cabecalhos:dict = {}):
+        self._responder(302, cabecalhos={'Location': caminho, **cabecalhos})
+
+    def _sessao(self):
+        for cookie in self.headers.get('Cookie', '').split(';'):
+            nome, _, valor = cookie.strip().partition('=')
+            if nome == 'PHPSESSID':
+                return valor
+        return None
+
+    def do_POST(self):
+        servidor = self.server.dono
+        dados = parse_qs(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode())
+        if urlsplit(self.path).path != '/portal/valida.php':
+            return self._responder(404)
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+
+        login, senha = dados.get('loginUsuario', [''])[0], dados.get('senhaUsuario', [''])[0]
+        with servidor.trava:
+            servidor.estatisticas['logins'] += 1
+            if not servidor.aceitarLogin(login, senha):
+                servidor.estatisticas['loginsRecusados'] += 1
+                return self._redirecionar('/portal/login.php?action=loginFailed')
+            sessao = secrets.token_hex(16)
+            servidor.sessoes.add(sessao)
+        destino = dados.get('redir', ['painel.php'])[0]
+        self._redirecionar(f'/portal/{destino}', {'Set-Cookie': f'PHPSESSID={sessao}; Path=/portal; HttpOnly'})
+
+    def do_GET(self):
+        servidor = self.server.dono
+        caminho = urlsplit(self.path).path
+
+        if caminho == '/estatisticas':
+            with servidor.trava:
+                corpo = json.dumps(servidor.estatisticas).encode()
+            return self._responder(200, corpo, {'Content-Type': 'application/json'})
+        if caminho in ('/portal/login.php', '/portal/painel.php'):
+            return self._responder(200, b'<html><body>Portal de Servicos</body></html>', {'Content-Type': 'text/html'})
+        if caminho != '/portal/apps/TCC-Grad/comunica.php':
+            return self._responder(404)
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+
+        with servidor.trava:
+            # Sem uma sessão válida, o portal redireciona para a página de login
+            if self._sessao() not in servidor.sessoes:
+                servidor.estatisticas['redirecionamentos'] += 1
+                return self._redirecionar('/portal/login.php')
+            servidor.estatisticas['paginas'] += 1
+            corpo, etag, modificado = servidor.pagina()
+
+        if servidor.condicional:
+            if self.headers.get('If-None-Match') == etag or (not self.headers.get('If-None-Match') and
+                                                             self.headers.get('If-Modified-Since') == modificado):
+                with servidor.trava:
+                    servidor.estatisticas['naoModificadas'] += 1
+                return self._responder(304, cabecalhos={'ETag': etag, 'Last-Modified': modificado})
+            cabecalhos = {'ETag': etag, 'Last-Modified': modificado}
+        else:
+            cabecalhos = {}
+        self._responder(200, corpo, {'Content-Type': 'text/html; charset=utf-8', **cabecalhos})
+
+
+class ServidorPortal:
+    """
+    Imitação do portal de serviços do INF em uma thread, em 127.0.0.1.
+
+    Parâmetros:
+    - porta (int): A porta; 0 escolhe uma porta livre.
+    - quantidade (int): O número de TCCs na página comunica.php.
+    - semente (int): A semente da página, como em paginaPortal.gerarPagina.
+    - latencia (float): Segundos de espera antes do login e de cada página.
+    - login, senha (str, optional): As credenciais aceitas. Se não forem informadas, qualquer login não vazio é aceito.
+    - condicional (bool): Se a página responde com ETag e Last-Modified e aceita requisições condicionais (304).
+    """
+
+    def __init__(self, porta:int = 0, quantidade:int = 1000, semente:int = 0, latencia:float = 0,
+                 login:str = None, senha:str = None, condicional:bool = True):
+        self.latencia = latencia
+        self.login = login
+        self.senha = senha
+        self.condicional = condicional
+        self.trava = threading.Lock()
+        self.sessoes = set()
+        self.estatisticas = {'logins': 0, 'loginsRecusados': 0, 'redirecionamentos': 0, 'paginas': 0, 'naoModificadas': 0}
+        self.quantidade = quantidade
+        self.semente = semente
+        self._pagina = None
+
+        self._http = ThreadingHTTPServer(('127.0.0.1', porta), _Requisicao)
+        self._http.daemon_threads = True
+        self._http.dono = self
+
+    @property
+    def portal(self):
+        """
+        O endereço base do portal, para obterNovosTCCs.PORTAL.
+        """
+        return f'http://127.0.0.1:{self._http.server_address[1]}/portal'
+
+    def aceitarLogin(self, login:str, senha:str):
+        if self.login is None:
+            return bool(login)
+        return login == self.login and senha == self.senha
+
+    def alterar(self, quantidade:int = None, semente:int = None):
+        """
+        Troca a página de TCCs, como quando uma defesa é cadastrada ou alterada no portal.
+        """
+        with self.trava:
+            self.quantidade = self.quantidade if quantidade is None else quantidade
+            self.semente = self.semente if semente is None else semente
+            self._pagina = None
+
+    def expirarSessoes(self):
+        """
+        Encerra todas as sessões, como quando o portal expira os cookies.
+        """
+        with self.trava:
+            self.sessoes.clear()
+
+    def pagina(self):
+        """
+        Retorna o corpo, o ETag e a data de modificação da página atual, gerada na primeira requisição.
+        Deve ser chamada com a trava.
+        """
+        if self._pagina is None:
+            corpo = gerarPagina(self.quantidade, self.semente).encode('utf-8')
+            self._pagina = (corpo, '"' + hashlib.sha1(corpo).hexdigest() + '"', formatdate(usegmt=True))
+        return self._pagina
+
+    def iniciar(self):
+        threading.Thread(target=self._http.serve_forever, name='servidorPortal', daemon=True).start()
+        return self
+
+    def parar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *erro):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que imita o portal de serviços do INF.')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--tccs', type=int, default=1000, help='Número de TCCs na página comunica.php.')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--latencia', type=float, default=0, help='Segundos de espera antes do login e de cada página.')
+    parser.add_argument('--sem-condicional', action='store_true', help='Não envia ETag nem responde 304.')
+    args = parser.parse_args()
+
+    servidor = ServidorPortal(args.porta, args.tccs, args.semente, args.latencia, condicional=not args.sem_condicional)
+    print(f'Portal em {servidor.portal} com {args.tccs} TCCs (qualquer login é aceito)')
+    try:
+        servidor._http.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor._http.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Servidor local que imita os endpoints da API do TinyURL usados por lib/encurtador_tinyURL.py (POST /create e
+    GET /alias/<domínio>/<alias>), com latência, colisões de alias e erros configuráveis. Serve para medir o
+    encurtamento e testar as novas tentativas sem acesso à rede.
+
+    Uso, a partir da pasta do projeto:
+    $ python benchmarks/servidorTinyURL.py --porta 8766 --latencia 0.05 --erros 0.1
+    $ TINYURL_API=http://127.0.0.1:8766 python gerarImagensTCC_GUI.py   # Encurta os links ao importar os TCCs
+
+    Ou, dentro de um script:
+    >>> with ServidorTinyURL(latencia=0.02, colisoes=0.2) as servidor:
+    ...     encurtador.configurar(api=servidor.endereco, credenciais={'token': 'local', 'email': EMAIL})
+    ...     encurtador.shorten_url('https://mconf.ufrgs.br/webconf/00001', 'defesa-AnSouza')
+"""
+
+import argparse
+import json
+import random
+import re
+import string
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Dono dos links criados pelo servidor; use nas credenciais do encurtador
+EMAIL = 'comunica@inf.ufrgs.br'
+# Dono dos aliases ocupados pelas colisões simuladas
+EMAIL_OUTRO = 'outro@exemplo.com'
+
+_ALIAS = re.compile(r'^/alias/([^/]+)/([^/?]+)$')
+
+
+class _Requisicao(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, codigo:int, dados:dict, cabecalhos:dict = {}):
+        corpo = json.dumps(dados).encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _erroSimulado(self):
+        """
+        Aplica a latência e, conforme a taxa de erros, responde 429 ou 500 no lugar da API.
+        """
+        servidor = self.server.dono
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+        with servidor.trava:
+            servidor.estatisticas['requisicoes'] += 1
+            if servidor.rng.random() >= servidor.erros:
+                return False
+            servidor.estatisticas['erros'] += 1
+            limite = servidor.rng.random() < 0.5
+        if limite:
+            self._responder(429, {'code': 429, 'errors': ['Too Many Requests']}, {'Retry-After': '0'})
+        else:
+            self._responder(500, {'code': 500, 'errors': ['Internal Server Error']})
+        return True
+
+    def do_GET(self):
+        if self.path == '/estatisticas':
+            with self.server.dono.trava:
+                return self._responder(200, dict(self.server.dono.estatisticas))
+
+        encontrado = _ALIAS.match(self.path)
+        if not encontrado:
+            return self._responder(404, {'code': 404, 'errors': ['Not Found']})
+        if self._erroSimulado():
+            return
+
+        dominio, alias = encontrado.groups()
+        servidor = self.server.dono
+        with servidor.trava:
+            servidor.estatisticas['consultas'] += 1
+            link = servidor.consultar(alias)
+        if link is None:
+            return self._responder(404, {'code': 404, 'errors': ['Alias not found.']})
+        self._responder(200, {'code': 0, 'errors': [], 'data': {
+            'domain': dominio, 'alias': alias, 'tiny_url': f'https://{dominio}/{alias}', **link}})
+
+    def do_POST(self):
+        tamanho = int(self.headers.get('Content-Length', 0))
+        try:
+            pedido = json.loads(self.rfile.read(tamanho) or b'{}')
+        except ValueError:
+            return self._responder(400, {'code': 400, 'errors': ['Invalid JSON.']})
+
+        if self.path != '/create':
+            return self._responder(404, {'code': 404, 'errors': ['Not Found']})
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self._responder(401, {'code': 401, 'errors': ['Unauthenticated.']})
+        if self._erroSimulado():
+            return
+
+        dominio = pedido.get('domain') or 'tinyurl.com'
+        servidor = self.server.dono
+        with servidor.trava:
+            servidor.estatisticas['criacoes'] += 1
+            alias = servidor.criar(pedido.get('url', ''), pedido.get('alias') or '')
+            if alias is None:
+                servidor.estatisticas['colisoes'] += 1
+        if alias is None:
+            return self._responder(422, {'code': 5, 'errors': ['Alias is not available.']})
+        self._responder(200, {'code': 0, 'errors': [], 'data': {
+            'url': pedido['url'], 'domain': dominio, 'alias': alias, 'tiny_url': f'https://{dominio}/{alias}'}})
+
+
+class ServidorTinyURL:
+    """
+    Imitação da API do TinyURL em uma thread, em 127.0.0.1.
+
+    Parâmetros:
+    - porta (int): A porta; 0 escolhe uma porta livre.
+    - latencia (float): Segundos de espera antes de cada resposta.
+    - colisoes (float): A fração dos aliases pedidos que já pertencem a outro link, de outra conta.
+    - erros (float): A fração das requisições respondidas com 429 ou 500.
+    - semente (int): A semente do sorteio de colisões e erros, para medições reproduzíveis.
+    """
+
+    def __init__(self, porta:int = 0, latencia:float = 0, colisoes:float = 0, erros:float = 0, semente:int = 0):
+        self.latencia = latencia
+        self.colisoes = colisoes
+        self.erros = erros
+        self.rng = random.Random(semente)
+        self.trava = threading.Lock()
+        self.links = {}
+        self.estatisticas = {'requisicoes': 0, 'criacoes': 0, 'consultas': 0, 'colisoes': 0, 'erros': 0}
+
+        self._http = ThreadingHTTPServer(('127.0.0.1', porta), _Requisicao)
+        self._http.daemon_threads = True
+        self._http.dono = self
+        self._thread = None
+
+    @property
+    def endereco(self):
+        return f'http://127.0.0.1:{self._http.server_address[1]}'
+
+    def _ocupado(self, alias:str):
+        """
+        Sorteia, uma única vez por alias, se ele já pertence a outro link. Deve ser chamada com a trava.
+        """
+        if alias not in self.links and self.colisoes and self.rng.random() < self.colisoes:
+            self.links[alias] = {'url': f'https://exemplo.com/{alias}', 'user': {'email': EMAIL_OUTRO}}
+        return alias in self.links
+
+    def consultar(self, alias:str):
+        if self._ocupado(alias):
+            return self.links[alias]
+        return None
+
+    def criar(self, url:str, alias:str):
+        """
+        Cria o link e retorna o alias, ou None se o alias pedido já estiver em uso.
+        """
+        if not alias:
+            alias = ''.join(self.rng.choices(string.ascii_lowercase + string.digits, k=8))
+        elif self._ocupado(alias):
+            return None
+        self.links[alias] = {'url': url, 'user': {'email': EMAIL}}
+        return alias
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._http.serve_forever, name='servidorTinyURL', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *erro):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que imita a API do TinyURL.')
+    parser.add_argument('--porta', type=int, default=8766)
+    parser.add_argument('--latencia', type=float, default=0, help='Segundos de espera antes de cada resposta.')
+    parser.add_argument('--colisoes', type=float, default=0, help='Fração dos aliases já ocupados por outra conta.')
+    parser.add_argument('--erros', type=float, default=0, help='Fração das requisições respondidas com 429 ou 500.')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    servidor = ServidorTinyURL(args.porta, args.latencia, args.colisoes, args.erros, args.semente)
+    print(f'Servidor em {servidor.endereco} (credenciais: email {EMAIL}, qualquer token)')
+    try:
+        servidor._http.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor._http.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Verifica o encurtador com um cache de aliases no formato das versões anteriores ({alias: 'https://tinyurl.com/alias'}),
+    no modo offline e com o servidor local do TinyURL: os links já criados devem ser reaproveitados, sem criar links
+    duplicados, e o cache deve ser migrado para o formato {alias: destino}.
+
+    Uso, a partir da pasta do projeto:
+    $ python benchmarks/verificarEncurtador.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.servidorTinyURL import EMAIL, ServidorTinyURL
+import lib.encurtador_tinyURL as encurtador
+
+REUNIAO = 'https://meet.google.com/abc-defg-hij'
+CACHE_LEGADO = {
+    'defesa-AnSilva': 'https://tinyurl.com/defesa-AnSilva',
+    'defesa-BoSouza': 'https://tinyurl.com/defesa-BoSouza',
+}
+
+
+def _reiniciar(pasta:str):
+    """
+    Grava o cache antigo e descarta o estado em memória do encurtador.
+    """
+    encurtador.CACHE = os.path.join(pasta, 'url-aliases-cache.json')
+    with open(encurtador.CACHE, 'w') as f:
+        json.dump(CACHE_LEGADO, f)
+    encurtador._aliases = None
+    encurtador._reservados.clear()
+
+
+def main():
+    falhas = []
+    def verificar(condicao, mensagem):
+        print(('ok    ' if condicao else 'FALHA ') + mensagem)
+        if not condicao:
+            falhas.append(mensagem)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        _reiniciar(pasta)
+        encurtador.configurar(offline=True)
+        verificar(encurtador.encurtarURLDefesa(REUNIAO, 'Ana Silva') == 'https://tinyurl.com/defesa-AnSilva',
+                  'offline: o alias antigo é reaproveitado')
+        verificar(encurtador.get_alias_for_url('https://tinyurl.com/defesa-BoSouza') is None,
+                  'offline: entradas antigas não entram no índice reverso')
+
+        _reiniciar(pasta)
+        encurtador.limite = encurtador.LimiteTaxa(1000, 1000)
+        with ServidorTinyURL() as servidor:
+            servidor.links['defesa-AnSilva'] = {'url': REUNIAO, 'user': {'email': EMAIL}}
+            servidor.links['defesa-BoSouza'] = {'url': 'https://meet.google.com/outra', 'user': {'email': EMAIL}}
+            encurtador.configurar(api=servidor.endereco, offline=False, credenciais={'token': 'local', 'email': EMAIL})
+
+            verificar(encurtador.encurtarURLDefesa(REUNIAO, 'Ana Silva') == 'https://tinyurl.com/defesa-AnSilva',
+                      'online: o alias antigo que aponta para a URL é reaproveitado')
+            verificar(encurtador.encurtarURLDefesa('https://meet.google.com/nova', 'Bo Souza') == 'https://tinyurl.com/defesa-BoSouza1',
+                      'online: o alias antigo que aponta para outra URL é pulado')
+            verificar(servidor.estatisticas['criacoes'] == 1, 'online: apenas um link novo foi criado')
+
+        encurtador.flush_aliases_cache()
+        with open(encurtador.CACHE, 'r') as f:
+            cache = json.load(f)
+        verificar(cache.get('defesa-AnSilva') == REUNIAO and cache.get('defesa-BoSouza') == 'https://meet.google.com/outra',
+                  'o cache foi migrado para o formato {alias: destino}')
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,7 @@ from lib.pos.imagemTotem import modeloDefesaTotem
 from lib.interpretadorDados import intepretarDados
 import os
 from lib.ctk_dialog import CTkDialog
+from lib.saida import aguardarSaida
 
 
 import customtkinter
@@ -70,6 +71,12 @@ def button_function():
     modeloDefesaFeed(tituloCard, dados, escalaCard)
     modeloDefesaTotem(tituloCard, dados, escalaCard)
     print(dados)
+
+    # Aguarda a gravação das imagens antes de abrir a pasta
+    erros = aguardarSaida()
+    if erros:
+        CTkDialog('Erro', f'Não foi possível salvar as imagens\n\n{erros[0]}')
+        return
     
     os.startfile('output\\imagens')
     
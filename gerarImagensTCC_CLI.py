@@ -0,0 +1,154 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Versão de linha de comando do gerador de TCCs, sem interface gráfica, para execução agendada.
+
+    Exemplos:
+    $ python gerarImagensTCC_CLI.py                              # Stories e calendário dos próximos 6 dias
+    $ python gerarImagensTCC_CLI.py --inicio 01/07/2025 --intervalo 13 --feed
+    $ python gerarImagensTCC_CLI.py --sem-imagens                # Apenas o calendário
+    $ python gerarImagensTCC_CLI.py --caixa defesas.mbox --curso 'Ciência da Computação' --sem-imagens --sem-calendario
+
+    Os módulos de renderização só são importados quando há imagens a gerar, para que a inicialização seja rápida.
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import re
+import sys
+
+from lib.mesclarTCCs import semestre
+
+
+def data(valor:str):
+    """
+    Valida uma data no formato dd/mm/aaaa para o argparse.
+    """
+    if re.search(r'^\d{2}/\d{2}/\d{4}$', valor) is None:
+        raise argparse.ArgumentTypeError('Data de início inválida, use dd/mm/aaaa')
+    try:
+        datetime.datetime.strptime(valor, '%d/%m/%Y')
+    except ValueError:
+        raise argparse.ArgumentTypeError('Data de início inválida, use dd/mm/aaaa')
+    return valor
+
+
+def lerArgumentos(argv = None):
+    hoje = datetime.date.today()
+
+    parser = argparse.ArgumentParser(description='Gera as imagens e o calendário das defesas de TCC salvas no banco de TCCs.')
+    parser.add_argument('--inicio', type=data, default=hoje.strftime('%d/%m/%Y'), help='Data de início (dd/mm/aaaa). Padrão: hoje.')
+    parser.add_argument('--intervalo', type=int, default=6, help='Intervalo de dias a partir da data de início. Padrão: 6.')
+    parser.add_argument('--semestre', default=semestre(hoje), help='Semestre exibido nos stories.')
+    parser.add_argument('--dados', default=None, help='Arquivo JSON com os TCCs. Padrão: o banco data/TCCs.db.')
+    parser.add_argument('--caixa', default=None, help='Caixa de email (arquivo mbox ou pasta maildir) cujos TCCs são importados para o banco antes da geração.')
+    parser.add_argument('--curso', default=None, help='Curso dos TCCs importados com --caixa.')
+    parser.add_argument('--feed', action='store_true', help='Gera também as imagens de feed.')
+    parser.add_argument('--sem-stories', dest='stories', action='store_false', help='Não gera as imagens de stories.')
+    parser.add_argument('--sem-imagens', dest='imagens', action='store_false', help='Não gera nenhuma imagem.')
+    parser.add_argument('--sem-calendario', dest='calendario', action='store_false', help='Não gera o CSV do calendário.')
+    parser.add_argument('--processos', type=int, default=None, help='Número de processos de renderização. Padrão: um por núcleo.')
+
+    args = parser.parse_args(argv)
+    if args.intervalo < 0:
+        parser.error('Intervalo inválido')
+    if args.caixa and not args.curso:
+        parser.error('Informe o curso dos TCCs da caixa com --curso')
+    if args.caixa and args.dados:
+        parser.error('--caixa importa os TCCs para o banco e não pode ser usado com --dados')
+    return args
+
+
+def gerarImagens(tccs:list, args):
+    """
+    Renderiza as páginas do período, informando cada uma conforme termina.
+
+    Returns:
+        int: O número de páginas que não puderam ser geradas.
+    """
+    from lib.renderizadorLote import tarefasTCC, renderizarLote
+
+    os.makedirs('./output/imagens', exist_ok=True)
+
+    tarefas = tarefasTCC(tccs, args.semestre, args.stories, args.feed)
+    erros = 0
+    for i, (arquivo, erro) in enumerate(renderizarLote(tarefas, args.processos), 1):
+        if erro:
+            erros += 1
+        print(f'[{i}/{len(tarefas)}] {arquivo}' + (f' - Erro: {erro}' if erro else ''))
+    return erros
+
+
+def gerarCalendario(tccs:list, args):
+    from lib.gerarCalendariosCSV import gerarCalendarioEventos
+
+    os.makedirs('./output/calendario', exist_ok=True)
+
+    nome_arquivo = f"TCCs_{args.inicio.replace('/', '-')}_{args.intervalo}"
+    gerarCalendarioEventos(tccs, nome_arquivo=nome_arquivo)
+    print(f'Calendário salvo em: ./output/calendario/calendario-{nome_arquivo}.csv')
+
+
+def importarCaixa(args):
+    """
+    Importa para o banco os TCCs da caixa de email, listando as defesas da pós encontradas.
+
+    Returns:
+        int: O número de TCCs importados.
+    """
+    from lib.bancoTCCs import abrirBanco
+    from lib.caixaEmails import importarTCCsCaixa
+
+    def defesaPos(defesa):
+        print(f"  Defesa da pós: {defesa['Aluno']} ({defesa['Tipo']}) - {defesa['Data']}")
+
+    banco = abrirBanco()
+    try:
+        importados = importarTCCsCaixa(banco, args.caixa, args.curso, defesaPos)
+    finally:
+        banco.close()
+    print(f'TCCs importados de {args.caixa}: {importados}')
+    return importados
+
+
+def main(argv = None):
+    args = lerArgumentos(argv)
+
+    if args.caixa:
+        importarCaixa(args)
+
+    if args.dados:
+        from lib.filtroDatas import filtrarPeriodo
+        with open(args.dados, 'r', newline='', encoding='UTF-8') as f:
+            tccs = filtrarPeriodo(json.load(f), args.inicio, args.intervalo)
+    else:
+        from lib.bancoTCCs import obterIndice
+        tccs = obterIndice().periodo(args.inicio, args.intervalo)
+
+    print(f'Apresentações no intervalo selecionado [{len(tccs)}]:')
+    for x in tccs:
+        print(f"  {x['Aluno']} ({x['Curso']}) - {x['Data']}")
+
+    if len(tccs) == 0:
+        print('Nenhum TCC encontrado')
+        return 0
+
+    erros = 0
+    if args.imagens and (args.stories or args.feed):
+        erros = gerarImagens(tccs, args)
+    if args.calendario:
+        gerarCalendario(tccs, args)
+
+    return 1 if erros else 0
+
+
+if __name__ == '__main__':
+    # Necessário para os processos de renderização no executável gerado pelo PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -4,63 +4,54 @@ Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
 """
 
 import datetime
+import multiprocessing
 import os
+import queue
 import re
+import threading
 import customtkinter
-import json
-from lib.tcc.imagemStories import modeloTCCStories
-from lib.tcc.imagemFeed import modeloTCCFeed
+from lib.bancoTCCs import BANCO, obterIndice
+from lib.renderizadorLote import tarefasTCC, renderizarLote
 from lib.obterNovosTCCs import obterNovosTCCs
 from lib.gerarCalendariosCSV import gerarCalendarioEventos
+from lib.mesclarTCCs import semestre as semestreLetivo
 from lib.ctk_dialog import CTkDialog
 
   
 
-# Inicializa a aplicação
-customtkinter.set_appearance_mode("System") 
-customtkinter.set_default_color_theme("green")  
-app = customtkinter.CTk() 
-app.title("Gerar imagens de defesa de TCCs")
-app.iconbitmap('assets/img/icon.ico')
-app.grid_columnconfigure((0, 1), weight=1)
+listaTCCs = []
 
-TODAY = datetime.date.today()
+# Chave da última busca feita e busca agendada pelo movimento do mouse
+busca = {'chave': None, 'agendada': None}
 
-# Define as variáveis que serão usadas
-variables = {
-    'data_inicio': customtkinter.StringVar(value=TODAY.strftime('%d/%m/%Y')),
-    'intervalo': customtkinter.StringVar(value=6),
-    'semestre': customtkinter.StringVar(value=f'{TODAY.year}/{1 if TODAY.month < 6 else 2}')
-    }
+def chaveBusca():
+    """
+    Identifica uma busca pela data de início, pelo intervalo e pela versão do banco (data de modificação e tamanho).
+    """
+    try:
+        info = os.stat(BANCO)
+        versao = (info.st_mtime_ns, info.st_size)
+    except OSError:
+        versao = None
+    return (variables['data_inicio'].get(), variables['intervalo'].get(), versao)
 
-listaTCCs = []
 
-def filtrarDatas(elemento, data_inicio = None, intervalo = None):
+def agendarBusca(e = None):
     """
-    Função que filtra os elementos de acordo com a data de início e intervalo
+    Agenda a busca dos dados para quando o mouse parar de se mover, evitando uma busca a cada movimento.
 
     Args:
-        elemento (dict): Elemento a ser filtrado
-        data_inicio (datetime.date): Data de início
-        intervalo (int): Intervalo de dias
-
-    Returns:
-        bool: Retorna True se o elemento está dentro do intervalo
+        e (Event): Evento que chamou a função
     """
-    if not data_inicio or not intervalo:
-        data_inicio = variables['data_inicio'].get()
-        intervalo = int(variables['intervalo'].get())
-
-
-    data_evento = datetime.datetime.strptime(elemento['Data'], '%d/%m/%Y').date()
-    data_inicio = datetime.datetime.strptime(data_inicio, '%d/%m/%Y').date()
-    
-    return data_evento >= data_inicio and data_evento <= data_inicio + datetime.timedelta(days=intervalo)
+    if busca['agendada'] is not None:
+        app.after_cancel(busca['agendada'])
+    busca['agendada'] = app.after(250, buscarDados)
 
 
 def buscarDados(e = None):
     """
-    Função que que busca os dados no JSON local de acordo com a data de início e intervalo
+    Função que que busca os dados no banco de TCCs de acordo com a data de início e intervalo.
+    A busca só é refeita se a data, o intervalo ou o banco mudaram desde a última vez.
 
     Args:
         e (Event): Evento que chamou a função
@@ -69,8 +60,13 @@ def buscarDados(e = None):
     global listaTCCs
     global variables
 
-    data_inicio = variables['data_inicio'].get()
-    intervalo = variables['intervalo'].get()
+    busca['agendada'] = None
+    chave = chaveBusca()
+    if chave == busca['chave']:
+        return
+    busca['chave'] = chave
+
+    data_inicio, intervalo, _ = chave
     if(re.search(r'^\d{2}/\d{2}/\d{4}$', data_inicio) == None):
         CTkDialog('Erro', 'Data de início inválida')
         return
@@ -79,50 +75,97 @@ def buscarDados(e = None):
         return
     
     
-    with open('./data/TCCs.json', 'r', newline='', encoding='UTF-8') as f:
-        json_ = json.load(f)
-        filtered = list(filter(filtrarDatas, json_))
-
-        listaTCCs = filtered
+    listaTCCs = obterIndice().periodo(data_inicio, intervalo)
     
     nomes.configure(text=f"Apresentações no intervalo selecionado [{len(listaTCCs)}]:\n {', \n'.join([f'{x['Aluno']} ({x['Curso']}) - {x['Data']}' for x in listaTCCs])}")
 
+# Importação em andamento: a thread, a fila de mensagens para a interface e o pedido de cancelamento
+importacao = {'thread': None, 'fila': queue.Queue(), 'cancelar': threading.Event()}
+
+# Descrição das etapas informadas por obterNovosTCCs
+ETAPAS = {
+    'login': 'Entrando no portal',
+    'pagina': 'Baixando a página de TCCs',
+    'interpretar': 'Interpretando os TCCs',
+    'encurtar': 'Encurtando links',
+    'salvar': 'Salvando os TCCs',
+}
+
 def importarDadosDoPortal():
     """
-    Busca os TCCs no portal de serviços do INF. Utiliza a função obterNovosTCCs do arquivo obterNovosTCCs.py para isso.
+    Busca os TCCs no portal de serviços do INF em segundo plano. Utiliza a função obterNovosTCCs do arquivo obterNovosTCCs.py para isso.
+    Se a busca já estiver em andamento, pede o cancelamento.
     """
     global ultima_atualizacao
     global btn_importarPortal
 
-    ultima_atualizacao.configure(text="Última atualização: Aguarde...")
-    btn_importarPortal.configure(state='disabled') # Desabilita o botão de importar
+    if importacao['thread'] is not None:
+        importacao['cancelar'].set()
+        btn_importarPortal.configure(state='disabled', text="Cancelando...")
+        return
+
+    importacao['cancelar'].clear()
+    importacao['thread'] = threading.Thread(target=importarDadosDoPortal_, daemon=True)
+    importacao['thread'].start()
 
-    app.after(100, importarDadosDoPortal_) # Delay the execution of processarDadosDoPortal function
+    ultima_atualizacao.configure(text="Última atualização: Aguarde...")
+    btn_importarPortal.configure(text="Cancelar busca")
+    app.after(100, acompanharImportacao)
 
 
 def importarDadosDoPortal_():
+    """
+    Executa a importação. Roda na thread de importação e só se comunica com a interface pela fila.
+    """
+    fila = importacao['fila']
+    try:
+        message = obterNovosTCCs(False, False, progresso=lambda *etapa: fila.put(('progresso', etapa)), cancelar=importacao['cancelar'])
+    except Exception as e:
+        message = {'error': f'Erro ao buscar os TCCs: {e}'}
+    fila.put(('fim', message))
+
+
+def acompanharImportacao():
+    """
+    Atualiza a interface com as mensagens da thread de importação. Roda na thread principal.
+    """
     global ultima_atualizacao
     global btn_importarPortal
 
-    message = obterNovosTCCs(False, False) # Obtem os TCCs do portal
+    message = None
+    while True:
+        try:
+            tipo, conteudo = importacao['fila'].get_nowait()
+        except queue.Empty:
+            break
+        if tipo == 'progresso':
+            etapa, atual, total = conteudo
+            ultima_atualizacao.configure(text=f"Última atualização: {ETAPAS.get(etapa, etapa)}" + (f" {atual}/{total}" if total else "") + "...")
+        else:
+            message = conteudo
+
+    if message is None:
+        app.after(100, acompanharImportacao)
+        return
+
+    importacao['thread'] = None
+    btn_importarPortal.configure(state='normal', text="Buscar TCCs no portal") # Habilita o botão de importar
 
     # Exibe mensagens de erro ou sucesso
     for key in message:
         if key == 'error':
             CTkDialog('Erro', message[key])
             ultima_atualizacao.configure(text=f"Ocorreu um erro ao buscar os TCCs")
-            return
         elif key == 'success':
             CTkDialog('Sucesso', message[key])
             ultima_atualizacao.configure(text=f"Última atualização: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
-            return
+            buscarDados() # Atualiza a lista se o banco mudou
+        elif key == 'cancelado':
+            ultima_atualizacao.configure(text=f"Última atualização: {datetime.datetime.fromtimestamp(os.path.getmtime(BANCO)).strftime('%d/%m/%Y %H:%M:%S')}")
         else:
             CTkDialog(key, message[key])
             ultima_atualizacao.configure(text=f"Ocorreu um erro ao buscar os TCCs")
 
-    btn_importarPortal.configure(state='normal') # Habilita o botão de importar
-
-
 
 def gerarImagens(stories = True, feed = False):
     global listaTCCs
@@ -133,26 +176,17 @@ def gerarImagens(stories = True, feed = False):
         CTkDialog('Erro', 'Nenhum TCC encontrado')
         return
     
-    ecp = sorted(filter(lambda x: x['Curso'] == 'Engenharia de Computação', dados), key=lambda x: x['Data'])
-    cic = sorted(filter(lambda x: x['Curso'] == 'Ciência da Computação', dados), key=lambda x: x['Data'])
-
-    if(feed):
-        grupos = [ecp[i:i+2] for i in range(0, len(ecp), 2)] # Agrupa de 2 em 2
-        for s in grupos:
-            modeloTCCFeed(s)
-
-        groupos = [cic[i:i+2] for i in range(0, len(cic), 2)] # Agrupa de 2 em 2
-        for s in groupos:
-            modeloTCCFeed(s)
-    
-    if(stories):
-        grupos = [ecp[i:i+4] for i in range(0, len(ecp), 4)] # Agrupa de 4 em 4
-        for s in grupos:
-            modeloTCCStories(s, variables['semestre'].get())
-        
-        grupos = [cic[i:i+4] for i in range(0, len(cic), 4)] # Agrupa de 4 em 4
-        for s in grupos:
-            modeloTCCStories(s, variables['semestre'].get())
+    # Renderiza as páginas em paralelo, informando cada uma conforme termina
+    tarefas = tarefasTCC(dados, variables['semestre'].get(), stories, feed)
+    erros = []
+    for i, (arquivo, erro) in enumerate(renderizarLote(tarefas), 1):
+        if erro:
+            erros.append(f'{os.path.basename(arquivo)}: {erro}')
+        print(f'[{i}/{len(tarefas)}] {arquivo}' + (f' - Erro: {erro}' if erro else ''))
+
+    if erros:
+        CTkDialog('Erro', 'Não foi possível gerar algumas imagens:\n' + '\n'.join(erros))
+        return
 
     os.startfile('output\\imagens')
     CTkDialog('Sucesso', 'Imagens geradas com sucesso')
@@ -164,45 +198,69 @@ def gerarCalendario():
     CTkDialog('Sucesso', 'Calendário gerado com sucesso\nVerifique a pasta output/calendario')
 
 
-# Define a posição dos elementos na tela
-padx = 5
-pady = 5
-sticky = 'ew'
+if __name__ == '__main__':
+    # Necessário para os processos de renderização no executável gerado pelo PyInstaller
+    multiprocessing.freeze_support()
+
+    # Inicializa a aplicação
+    customtkinter.set_appearance_mode("System") 
+    customtkinter.set_default_color_theme("green")  
+    app = customtkinter.CTk() 
+    app.title("Gerar imagens de defesa de TCCs")
+    app.iconbitmap('assets/img/icon.ico')
+    app.grid_columnconfigure((0, 1), weight=1)
+
+    TODAY = datetime.date.today()
+
+    # Carrega os TCCs do banco, importando data/TCCs.json na primeira execução
+    obterIndice()
+
+    # Define as variáveis que serão usadas
+    variables = {
+        'data_inicio': customtkinter.StringVar(value=TODAY.strftime('%d/%m/%Y')),
+        'intervalo': customtkinter.StringVar(value=6),
+        'semestre': customtkinter.StringVar(value=semestreLetivo(TODAY))
+        }
+
+    # Define a posição dos elementos na tela
+    padx = 5
+    pady = 5
+    sticky = 'ew'
 
-# Linha 0
-btn_importarPortal = customtkinter.CTkButton(master=app, text="Buscar TCCs no portal", command=importarDadosDoPortal)
-btn_importarPortal.grid(row=0, column=0, columnspan=1, padx=padx, pady=pady, sticky=sticky)
+    # Linha 0
+    btn_importarPortal = customtkinter.CTkButton(master=app, text="Buscar TCCs no portal", command=importarDadosDoPortal)
+    btn_importarPortal.grid(row=0, column=0, columnspan=1, padx=padx, pady=pady, sticky=sticky)
 
-ultima_atualizacao = customtkinter.CTkLabel(app, text="Última atualização: ", justify="left")
-ultima_atualizacao.grid(row=0, column=1, columnspan=2, padx=padx, pady=pady, sticky='w')
-ultima_atualizacao.configure(text=f"Última atualização: {datetime.datetime.fromtimestamp(os.path.getmtime('./data/TCCs.json')).strftime('%d/%m/%Y %H:%M:%S')}")
+    ultima_atualizacao = customtkinter.CTkLabel(app, text="Última atualização: ", justify="left")
+    ultima_atualizacao.grid(row=0, column=1, columnspan=2, padx=padx, pady=pady, sticky='w')
+    ultima_atualizacao.configure(text=f"Última atualização: {datetime.datetime.fromtimestamp(os.path.getmtime(BANCO)).strftime('%d/%m/%Y %H:%M:%S')}")
 
 
-# Linha 1
-customtkinter.CTkLabel(app, text="Data de ínicio:").grid(row=1, column=0, padx=20, pady=20)
-data_ini =  customtkinter.CTkEntry(app, textvariable=variables['data_inicio'])
-data_ini.grid(row=1, column=1, padx=padx, pady=pady, sticky=sticky)
+    # Linha 1
+    customtkinter.CTkLabel(app, text="Data de ínicio:").grid(row=1, column=0, padx=20, pady=20)
+    data_ini =  customtkinter.CTkEntry(app, textvariable=variables['data_inicio'])
+    data_ini.grid(row=1, column=1, padx=padx, pady=pady, sticky=sticky)
 
-customtkinter.CTkLabel(app, text="Intervalo de dias:").grid(row=1, column=2, padx=20, pady=20)
-intervalo = customtkinter.CTkEntry(app, textvariable=variables['intervalo'])
-intervalo.grid(row=1, column=4, padx=padx, pady=pady, sticky=sticky)
+    customtkinter.CTkLabel(app, text="Intervalo de dias:").grid(row=1, column=2, padx=20, pady=20)
+    intervalo = customtkinter.CTkEntry(app, textvariable=variables['intervalo'])
+    intervalo.grid(row=1, column=4, padx=padx, pady=pady, sticky=sticky)
 
-customtkinter.CTkLabel(app, text="Semestre:").grid(row=2, column=0, padx=20, pady=20)
-semestre = customtkinter.CTkEntry(app, textvariable=variables['semestre'])
-semestre.grid(row=2, column=1, padx=padx, pady=pady, sticky=sticky)
+    customtkinter.CTkLabel(app, text="Semestre:").grid(row=2, column=0, padx=20, pady=20)
+    semestre = customtkinter.CTkEntry(app, textvariable=variables['semestre'])
+    semestre.grid(row=2, column=1, padx=padx, pady=pady, sticky=sticky)
 
-nomes = customtkinter.CTkLabel(app, text="")
-nomes.grid(row=5, column=0, columnspan=5, sticky='ew')
-nomes.configure(text="Nomes dos alunos: ")
+    nomes = customtkinter.CTkLabel(app, text="")
+    nomes.grid(row=5, column=0, columnspan=5, sticky='ew')
+    nomes.configure(text="Nomes dos alunos: ")
 
-# Adiciona o botão para gerar as imagens
-customtkinter.CTkButton(master=app, text="Gerar imagens", command=gerarImagens).grid(row=4, column=0,
-                                                                                        columnspan=2, padx=padx, pady=pady, sticky=sticky)
-customtkinter.CTkButton(master=app, text="Gerar CSV calendário", command=gerarCalendario).grid(row=4, column=3,
-                                                                                        columnspan=2, padx=padx, pady=pady, sticky=sticky)
+    # Adiciona o botão para gerar as imagens
+    customtkinter.CTkButton(master=app, text="Gerar imagens", command=gerarImagens).grid(row=4, column=0,
+                                                                                            columnspan=2, padx=padx, pady=pady, sticky=sticky)
+    customtkinter.CTkButton(master=app, text="Gerar CSV calendário", command=gerarCalendario).grid(row=4, column=3,
+                                                                                            columnspan=2, padx=padx, pady=pady, sticky=sticky)
 
 
-# Inicia a aplicação
-buscarDados()
-app.bind("<Motion>", buscarDados)
-app.mainloop()
\ No newline at end of file
+    # Inicia a aplicação
+    buscarDados()
+    app.bind("<Motion>", agendarBusca)
+    app.mainloop()
\ No newline at end of file
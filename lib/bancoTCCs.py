@@ -0,0 +1,262 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Armazenamento dos TCCs em um banco SQLite (data/TCCs.db).
+
+    Cada TCC é guardado no mesmo formato de data/TCCs.json, junto com colunas indexadas para a data, o curso e a
+    identidade (aluno, curso e semestre) e a impressão digital do conteúdo. Na primeira abertura, os TCCs de
+    data/TCCs.json são importados; exportarJSON gera novamente o arquivo no formato antigo.
+"""
+
+import json
+import os
+import sqlite3
+
+from lib.filtroDatas import IndiceDatas, ordinal
+from lib.mesclarTCCs import compararTCCs, identidade, impressaoDigital, semestre
+
+
+BANCO = './data/TCCs.db'
+JSON = './data/TCCs.json'
+
+# Índices de datas já carregados, por banco: {caminho: (versão do arquivo, índice)}
+_indices = {}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tccs (
+    id INTEGER PRIMARY KEY,
+    aluno TEXT NOT NULL,
+    curso TEXT NOT NULL,
+    semestre TEXT NOT NULL,
+    data INTEGER NOT NULL,
+    hora TEXT NOT NULL,
+    impressao TEXT NOT NULL,
+    dados TEXT NOT NULL,
+    UNIQUE (aluno, curso, semestre)
+);
+CREATE INDEX IF NOT EXISTS tccs_data ON tccs (data, hora);
+CREATE INDEX IF NOT EXISTS tccs_curso ON tccs (curso, data);
+"""
+_INSERIR = """
+    INSERT INTO tccs (aluno, curso, semestre, data, hora, impressao, dados) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (aluno, curso, semestre) DO UPDATE SET
+        data = excluded.data, hora = excluded.hora, impressao = excluded.impressao, dados = excluded.dados
+"""
+_ATUALIZAR = """
+    UPDATE tccs SET aluno = ?, curso = ?, semestre = ?, data = ?, hora = ?, impressao = ?, dados = ? WHERE id = ?
+"""
+
+# Versão dos dados do banco, em PRAGMA user_version. Na versão 1, o semestre passou a seguir a regra de
+# mesclarTCCs.semestre (janeiro a maio no primeiro semestre), a mesma da interface.
+_VERSAO = 1
+
+
+def abrirBanco(caminho:str = BANCO, origem:str = JSON):
+    """
+    Abre o banco de TCCs, criando-o se necessário. Um banco novo recebe os TCCs do arquivo JSON de origem; se a
+    importação falhar, o banco não é criado e o erro é propagado.
+
+    Args:
+        caminho (str): O caminho do banco.
+        origem (str): O arquivo JSON importado quando o banco é criado.
+
+    Returns:
+        sqlite3.Connection: A conexão com o banco.
+    """
+    if not os.path.exists(caminho) and origem and os.path.exists(origem):
+        _criarBanco(caminho, origem)
+
+    con = sqlite3.connect(caminho)
+    con.executescript(_ESQUEMA)
+    _migrar(con)
+    return con
+
+
+def _criarBanco(caminho:str, origem:str):
+    """
+    Cria o banco com os TCCs do arquivo JSON de origem. O banco é montado em um arquivo temporário, que só
+    toma o lugar do banco quando a importação termina; se ela falhar, o arquivo é removido e a próxima
+    abertura tenta de novo, em vez de encontrar um banco vazio.
+    """
+    temporario = caminho + '.novo'
+    # Sobra de uma criação interrompida
+    if os.path.exists(temporario):
+        os.remove(temporario)
+
+    con = sqlite3.connect(temporario)
+    try:
+        con.executescript(_ESQUEMA)
+        _migrar(con)
+        importarJSON(con, origem)
+        con.close()
+        os.replace(temporario, caminho)
+    except BaseException:
+        con.close()
+        os.remove(temporario)
+        raise
+
+
+def _migrar(con):
+    """
+    Atualiza os dados de um banco criado por uma versão anterior. O semestre dos TCCs é recalculado; se o
+    novo semestre colidir com outro TCC do mesmo aluno e curso, o TCC mantém o semestre antigo e é
+    localizado pelo semestre vizinho na próxima mescla.
+    """
+    versao, = con.execute('PRAGMA user_version').fetchone()
+    if versao >= _VERSAO:
+        return
+
+    with con:
+        linhas = con.execute('SELECT id, semestre, dados FROM tccs').fetchall()
+        alterados = [(semestre(json.loads(dados)['Data']), id, anterior) for id, anterior, dados in linhas]
+        con.executemany('UPDATE OR IGNORE tccs SET semestre = ? WHERE id = ?',
+                        [(novo, id) for novo, id, anterior in alterados if novo != anterior])
+        con.execute(f'PRAGMA user_version = {_VERSAO}')
+
+
+def _linha(tcc:dict):
+    aluno, curso, semestre = identidade(tcc)
+    return (aluno, curso, semestre, ordinal(tcc['Data']), tcc['Hora'], impressaoDigital(tcc), json.dumps(tcc, ensure_ascii=False))
+
+
+def salvarTCCs(con, tccs:list):
+    """
+    Insere ou atualiza os TCCs em uma única transação. TCCs com a mesma identidade são substituídos e mantêm
+    a posição original na exportação.
+
+    Args:
+        con (sqlite3.Connection): A conexão com o banco.
+        tccs (list): Os TCCs a serem salvos.
+    """
+    with con:
+        con.executemany(_INSERIR, [_linha(tcc) for tcc in tccs])
+
+
+def mesclarBanco(con, obtidos:list):
+    """
+    Mescla os TCCs obtidos do portal no banco. Apenas a identidade e a impressão digital dos TCCs salvos são
+    lidas; o conteúdo só é carregado para os TCCs alterados ou removidos. TCCs alterados são gravados sobre
+    a linha do TCC salvo, inclusive quando mudaram de semestre.
+
+    Args:
+        con (sqlite3.Connection): A conexão com o banco.
+        obtidos (list): Os TCCs obtidos do portal.
+
+    Returns:
+        dict: As alterações, como em mesclarTCCs.compararTCCs.
+    """
+    indice = {(aluno, curso, semestre): (id, impressao) for id, aluno, curso, semestre, impressao
+              in con.execute('SELECT id, aluno, curso, semestre, impressao FROM tccs')}
+
+    def obterSalvo(id):
+        return json.loads(con.execute('SELECT dados FROM tccs WHERE id = ?', (id,)).fetchone()[0])
+
+    alteracoes = compararTCCs(indice, obtidos, obterSalvo)
+    with con:
+        con.executemany(_ATUALIZAR, [_linha(alteracao['tcc']) + (indice[alteracao['anterior']][0],) for alteracao in alteracoes['atualizados']])
+        con.executemany(_INSERIR, [_linha(tcc) for tcc in alteracoes['novos']])
+    return alteracoes
+
+
+def consultarPeriodo(con, data_inicio:str, intervalo:int, curso:str = None):
+    """
+    Busca os TCCs entre a data de início e o fim do intervalo, inclusive, ordenados por data e hora.
+
+    Args:
+        con (sqlite3.Connection): A conexão com o banco.
+        data_inicio (str): A data de início no formato dd/mm/aaaa.
+        intervalo (int): O intervalo de dias.
+        curso (str, optional): Restringe a busca a um curso.
+
+    Returns:
+        list: Os TCCs encontrados.
+    """
+    inicio = ordinal(data_inicio)
+    consulta = 'SELECT dados FROM tccs WHERE data BETWEEN ? AND ?'
+    parametros = [inicio, inicio + int(intervalo)]
+    if curso:
+        consulta += ' AND curso = ?'
+        parametros.append(curso)
+
+    return [json.loads(dados) for dados, in con.execute(consulta + ' ORDER BY data, hora, id', parametros)]
+
+
+def consultarCurso(con, curso:str):
+    """
+    Busca todos os TCCs de um curso, ordenados por data e hora.
+    """
+    return [json.loads(dados) for dados, in con.execute('SELECT dados FROM tccs WHERE curso = ? ORDER BY data, hora, id', (curso,))]
+
+
+def indiceDatas(con, curso:str = None):
+    """
+    Carrega os TCCs em um índice de datas. Os TCCs já saem do banco ordenados, com o número do dia.
+
+    Args:
+        con (sqlite3.Connection): A conexão com o banco.
+        curso (str, optional): Restringe o índice a um curso.
+
+    Returns:
+        IndiceDatas: O índice, para consultas por período.
+    """
+    consulta, parametros = 'SELECT data, dados FROM tccs', ()
+    if curso:
+        consulta, parametros = consulta + ' WHERE curso = ?', (curso,)
+
+    linhas = con.execute(consulta + ' ORDER BY data, hora, id', parametros).fetchall()
+    return IndiceDatas([json.loads(dados) for _, dados in linhas], [data for data, _ in linhas])
+
+
+def obterIndice(caminho:str = BANCO):
+    """
+    Retorna o índice de datas de todos os TCCs do banco, recarregando-o apenas quando o arquivo do banco
+    muda (data de modificação ou tamanho).
+
+    Returns:
+        IndiceDatas: O índice, para consultas por período.
+    """
+    if not os.path.exists(caminho):
+        abrirBanco(caminho).close()
+
+    info = os.stat(caminho)
+    versao = (info.st_mtime_ns, info.st_size)
+
+    if caminho not in _indices or _indices[caminho][0] != versao:
+        con = abrirBanco(caminho)
+        try:
+            _indices[caminho] = (versao, indiceDatas(con))
+        finally:
+            con.close()
+    return _indices[caminho][1]
+
+
+def todosTCCs(con):
+    """
+    Retorna todos os TCCs na ordem em que foram salvos, como em data/TCCs.json.
+    """
+    return [json.loads(dados) for dados, in con.execute('SELECT dados FROM tccs ORDER BY id')]
+
+
+def importarJSON(con, arquivo:str = JSON):
+    """
+    Importa os TCCs de um arquivo no formato de data/TCCs.json.
+
+    Returns:
+        int: O número de TCCs importados.
+    """
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        conteudo = f.read()
+    tccs = json.loads(conteudo) if conteudo.strip() else []
+    salvarTCCs(con, tccs)
+    return len(tccs)
+
+
+def exportarJSON(con, arquivo:str = JSON):
+    """
+    Exporta todos os TCCs no formato de data/TCCs.json.
+    """
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(todosTCCs(con), ensure_ascii=False, indent=4))
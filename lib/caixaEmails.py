@@ -0,0 +1,174 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Leitura de caixas de email (arquivo mbox ou pasta maildir) mensagem a mensagem. Apenas uma mensagem fica em
+    memória por vez, de modo que a caixa de um semestre inteiro possa ser importada de uma só vez.
+
+    Exemplo:
+    >>> for tipo, defesa in defesasCaixa('./data/defesas.mbox', 'Ciência da Computação'):
+    ...     print(tipo, defesa['Aluno'])
+"""
+
+import html
+import os
+import re
+from email.parser import BytesParser
+
+from lib.bancoTCCs import salvarTCCs
+from lib.interpretadorDados import camposEmailPos, emailPos, textoTCC
+
+
+_HTML_QUEBRA = re.compile(r'<br\s*/?>|</(?:p|div|tr|li|h\d)>', re.IGNORECASE)
+_HTML_ETIQUETA = re.compile(r'<[^>]*>')
+
+# Quantidade de TCCs gravados no banco por transação em importarTCCsCaixa
+_LOTE = 500
+
+
+def mensagensMbox(caminho:str):
+    """
+    Lê as mensagens de um arquivo mbox, uma a uma, sem carregar o arquivo inteiro.
+
+    Args:
+        caminho (str): O caminho do arquivo mbox.
+
+    Returns:
+        generator: Uma email.message.Message por mensagem.
+    """
+    leitor = BytesParser()
+    linhas = None
+    with open(caminho, 'rb') as f:
+        for linha in f:
+            # Cada mensagem começa com uma linha "From " (o envelope do mbox)
+            if linha.startswith(b'From '):
+                if linhas is not None:
+                    yield leitor.parsebytes(b''.join(linhas))
+                linhas = []
+            elif linhas is not None:
+                # Linhas do corpo que começam com "From " são gravadas como ">From " (mboxrd)
+                if linha.startswith(b'>') and linha.lstrip(b'>').startswith(b'From '):
+                    linha = linha[1:]
+                linhas.append(linha)
+    if linhas is not None:
+        yield leitor.parsebytes(b''.join(linhas))
+
+
+def mensagensMaildir(caminho:str):
+    """
+    Lê as mensagens de uma pasta maildir (subpastas new e cur), uma a uma, em ordem de nome.
+
+    Args:
+        caminho (str): O caminho da pasta maildir.
+
+    Returns:
+        generator: Uma email.message.Message por mensagem.
+    """
+    leitor = BytesParser()
+    for pasta in ('new', 'cur'):
+        pasta = os.path.join(caminho, pasta)
+        if not os.path.isdir(pasta):
+            continue
+        for nome in sorted(os.listdir(pasta)):
+            if nome.startswith('.'):
+                continue
+            with open(os.path.join(pasta, nome), 'rb') as f:
+                yield leitor.parse(f)
+
+
+def mensagensCaixa(caminho:str):
+    """
+    Lê as mensagens de uma caixa de email: uma pasta é lida como maildir, um arquivo como mbox.
+    """
+    if os.path.isdir(caminho):
+        return mensagensMaildir(caminho)
+    return mensagensMbox(caminho)
+
+
+def textoMensagem(mensagem):
+    """
+    Retorna o texto de uma mensagem, já decodificado. A primeira parte text/plain é preferida; se a mensagem só
+    tiver a parte HTML, as etiquetas são removidas. Anexos são ignorados.
+
+    Args:
+        mensagem (Message): A mensagem.
+
+    Returns:
+        str: O texto da mensagem, com quebras de linha '\n', ou '' se ela não tiver texto.
+    """
+    partes = {}
+    for parte in mensagem.walk():
+        if parte.get_content_maintype() != 'text' or parte.get_filename() or parte.get('Content-Disposition', '').startswith('attachment'):
+            continue
+        partes.setdefault(parte.get_content_subtype(), parte)
+
+    parte = partes.get('plain') or partes.get('html')
+    if parte is None:
+        return ''
+    conteudo = parte.get_payload(decode=True) or b''
+    try:
+        texto = conteudo.decode(parte.get_content_charset() or 'utf-8', errors='replace')
+    except LookupError:
+        texto = conteudo.decode('utf-8', errors='replace')
+
+    if parte is not partes.get('plain'):
+        texto = html.unescape(_HTML_ETIQUETA.sub('', _HTML_QUEBRA.sub('\n', texto)))
+    return texto.replace('\r\n', '\n')
+
+
+def defesasCaixa(caminho:str, curso:str = ''):
+    """
+    Percorre uma caixa de email e extrai as defesas de cada mensagem. Mensagens de defesa da pós são lidas por
+    emailPos e as demais por textoTCC; mensagens sem defesas são ignoradas.
+
+    Args:
+        caminho (str): O arquivo mbox ou a pasta maildir.
+        curso (str, optional): O curso atribuído aos TCCs, como em emailTCC.
+
+    Returns:
+        generator: Pares (tipo, defesa), com tipo 'pos' ou 'tcc'.
+    """
+    for mensagem in mensagensCaixa(caminho):
+        texto = textoMensagem(mensagem)
+        try:
+            if camposEmailPos(texto) is not None:
+                yield 'pos', emailPos(texto)
+            else:
+                for tcc in textoTCC(texto, curso):
+                    yield 'tcc', tcc
+        except (ValueError, IndexError) as erro:
+            print(f'Mensagem ignorada ({mensagem["subject"]}): {erro}')
+
+
+def importarTCCsCaixa(con, caminho:str, curso:str, defesaPos = None):
+    """
+    Importa para o banco os TCCs de uma caixa de email, gravando-os em lotes. As defesas da pós não são
+    acumuladas: cada uma é entregue à função defesaPos assim que é lida, de modo que a memória usada não
+    depende do tamanho da caixa.
+
+    Args:
+        con (sqlite3.Connection): A conexão com o banco de TCCs.
+        caminho (str): O arquivo mbox ou a pasta maildir.
+        curso (str): O curso dos TCCs.
+        defesaPos (callable, optional): Chamada com cada defesa da pós encontrada. Se não for informada, as
+            defesas da pós são ignoradas.
+
+    Returns:
+        int: O número de TCCs importados.
+    """
+    lote, importados = [], 0
+    for tipo, defesa in defesasCaixa(caminho, curso):
+        if tipo == 'pos':
+            if defesaPos is not None:
+                defesaPos(defesa)
+            continue
+        lote.append(defesa)
+        if len(lote) == _LOTE:
+            salvarTCCs(con, lote)
+            importados += len(lote)
+            lote = []
+
+    salvarTCCs(con, lote)
+    return importados + len(lote)
@@ -3,24 +3,180 @@ DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e
 Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
 """
 
+import atexit
+import hashlib
+import os
 import requests
+import string
 import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from unidecode import unidecode 
 from lib.utils import get_credentials
 from termcolor import cprint
 
 
-tinyurl = get_credentials('TinyURL')
+# Endereço da API e domínio dos links. TINYURL_API permite usar um servidor local, como benchmarks/servidorTinyURL.py
+API = os.environ.get('TINYURL_API', 'https://api.tinyurl.com').rstrip('/')
+DOMINIO = 'tinyurl.com'
+# No modo offline nenhuma requisição é feita: os links são montados a partir do alias, sem alterar o cache
+OFFLINE = os.environ.get('TINYURL_OFFLINE', '') not in ('', '0')
 
-headers = {
-        "Authorization": "Bearer " + tinyurl['token'], 
-        "Content-Type": "application/json"
-}
+_credenciais = None
+_sessao = None
+_travaSessao = threading.Lock()
+
+
+def configurar(api:str = None, offline:bool = None, credenciais:dict = None):
+    """
+    Altera o endereço da API, o modo offline ou as credenciais usadas pelo encurtador.
+
+    Args:
+        api (str, optional): O endereço base da API, por exemplo 'http://127.0.0.1:8766'.
+        offline (bool, optional): Se os links devem ser montados localmente, sem acessar a API.
+        credenciais (dict, optional): {'token', 'email'}, no lugar das credenciais do arquivo credenciais.json.
+    """
+    global API, OFFLINE, _credenciais, _sessao
+    with _travaSessao:
+        if api is not None:
+            API = api.rstrip('/')
+        if offline is not None:
+            OFFLINE = offline
+        if credenciais is not None:
+            _credenciais = credenciais
+        # A próxima requisição cria uma sessão com o novo cabeçalho de autorização
+        _sessao = None
+
+
+def credenciais():
+    """
+    Retorna as credenciais do TinyURL, lidas do arquivo credenciais.json apenas na primeira requisição.
+    """
+    global _credenciais
+    if _credenciais is None:
+        _credenciais = get_credentials('TinyURL')
+    return _credenciais
+
+
+class LimiteTaxa:
+    """
+    Limita a taxa de requisições compartilhada entre threads (balde de fichas): até `rajada` requisições
+    imediatas e, depois, `porSegundo` requisições por segundo.
+    """
+
+    def __init__(self, porSegundo:float, rajada:int = 1):
+        self.porSegundo = porSegundo
+        self.rajada = rajada
+        self._fichas = float(rajada)
+        self._ultima = time.monotonic()
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        """
+        Bloqueia até que uma requisição possa ser feita.
+        """
+        with self._trava:
+            agora = time.monotonic()
+            self._fichas = min(self.rajada, self._fichas + (agora - self._ultima) * self.porSegundo)
+            self._ultima = agora
+            espera = (1 - self._fichas) / self.porSegundo if self._fichas < 1 else 0
+            self._fichas -= 1
+        if espera > 0:
+            time.sleep(espera)
+
+
+# Limite de requisições à API do TinyURL, compartilhado por todas as threads
+limite = LimiteTaxa(porSegundo=5, rajada=5)
+
+# Tempo limite para conectar e para ler a resposta, em segundos
+TEMPO_LIMITE = (5, 20)
+# Número máximo de tentativas e espera base entre elas, em segundos
+TENTATIVAS = 5
+ESPERA_BASE = 0.5
+
+
+def _obterSessao():
+    """
+    Retorna a sessão compartilhada com a API, que mantém as conexões abertas entre requisições.
+    """
+    global _sessao
+    with _travaSessao:
+        if _sessao is None:
+            _sessao = requests.Session()
+            adaptador = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=8)
+            _sessao.mount('https://', adaptador)
+            _sessao.mount('http://', adaptador)
+            _sessao.headers.update({
+                "Authorization": "Bearer " + credenciais()['token'],
+                "Content-Type": "application/json"
+            })
+        return _sessao
+
+
+def requisicao(metodo:str, endereco:str, **kwargs):
+    """
+    Faz uma requisição à API do TinyURL respeitando o limite de taxa. Respostas 429 e 5xx e falhas de conexão
+    são repetidas com espera exponencial (ou a indicada em Retry-After).
+
+    Args:
+        metodo (str): 'GET', 'POST' ou 'PATCH'.
+        endereco (str): O caminho na API, como '/create'.
+        **kwargs: Repassados para Session.request, como json.
+
+    Returns:
+        Response: A última resposta da API.
+    """
+    for tentativa in range(TENTATIVAS):
+        limite.aguardar()
+        try:
+            response = _obterSessao().request(metodo, API + endereco, timeout=TEMPO_LIMITE, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if tentativa == TENTATIVAS - 1:
+                raise
+            time.sleep(ESPERA_BASE * 2 ** tentativa * (1 + random.random()))
+            continue
+
+        if response.status_code != 429 and response.status_code < 500 or tentativa == TENTATIVAS - 1:
+            return response
+
+        espera = response.headers.get('Retry-After')
+        time.sleep(float(espera) if espera and espera.isdigit() else ESPERA_BASE * 2 ** tentativa * (1 + random.random()))
+
+# Cache de aliases, carregado uma única vez: {alias: url} e o índice reverso {url: alias}
+CACHE = 'data/url-aliases-cache.json'
+_aliases = None
+_porURL = {}
+# Entradas gravadas pelas versões anteriores, no formato {alias: 'https://tinyurl.com/alias'}, sem o destino
+_legados = {}
+_alterado = False
+_travaCache = threading.RLock()
+
+
+def _carregarCache():
+    """
+    Carrega o arquivo de cache na primeira consulta. Deve ser chamada com _travaCache.
+    """
+    global _aliases
+    if _aliases is None:
+        try:
+            with open(CACHE, 'r') as f:
+                _aliases = json.load(f)
+        except FileNotFoundError:
+            _aliases = {}
+        _legados.clear()
+        _legados.update({alias: url for alias, url in _aliases.items() if url == f'https://{DOMINIO}/{alias}'})
+        for alias in _legados:
+            del _aliases[alias]
+        _porURL.clear()
+        _porURL.update({url: alias for alias, url in _aliases.items()})
 
 
 def update_aliases_cache(alias:str, url:str):
     """
     Atualiza o cache de aliases com um novo alias e sua URL correspondente.
+    A alteração fica em memória até flush_aliases_cache.
 
     Args:
         alias (str): O alias da URL encurtada.
@@ -29,11 +185,18 @@ def update_aliases_cache(alias:str, url:str):
     Returns:
         None
     """
-    with open('data/url-aliases-cache.json', 'r') as f:
-        aliases = json.load(f)
-        aliases[alias] = url
-    with open('data/url-aliases-cache.json', 'w+') as f:
-        json.dump(aliases, f, indent=4)
+    global _alterado
+    with _travaCache:
+        _carregarCache()
+        _legados.pop(alias, None)
+        anterior = _aliases.get(alias)
+        if anterior == url:
+            return
+        if _porURL.get(anterior) == alias:
+            del _porURL[anterior]
+        _aliases[alias] = url
+        _porURL[url] = alias
+        _alterado = True
 
 def get_alias_from_cache(alias:str):
     """
@@ -45,9 +208,40 @@ def get_alias_from_cache(alias:str):
     Returns:
         str: A URL correspondente ao alias, se existir. Caso contrário, None.
     """
-    with open('data/url-aliases-cache.json', 'r') as f:
-        j = json.load(f)
-        return j[alias] if alias in j else None
+    with _travaCache:
+        _carregarCache()
+        return _aliases.get(alias)
+
+def get_alias_for_url(url:str):
+    """
+    Obtém o alias que já aponta para uma URL, a partir do cache de aliases.
+
+    Args:
+        url (str): A URL de destino.
+
+    Returns:
+        str: O alias, se existir. Caso contrário, None.
+    """
+    with _travaCache:
+        _carregarCache()
+        return _porURL.get(url)
+
+def flush_aliases_cache():
+    """
+    Grava o cache de aliases, se houve alterações. O arquivo é escrito em um arquivo temporário e depois
+    substituído, de modo que nunca fica pela metade. Chamada ao fim de cada importação e ao encerrar o programa.
+    """
+    global _alterado
+    with _travaCache:
+        if not _alterado:
+            return
+        temporario = CACHE + '.tmp'
+        with open(temporario, 'w') as f:
+            json.dump({**_legados, **_aliases}, f, indent=4)
+        os.replace(temporario, CACHE)
+        _alterado = False
+
+atexit.register(flush_aliases_cache)
         
 
 def unshorten_url(alias:str):
@@ -62,18 +256,37 @@ def unshorten_url(alias:str):
     """
     
     # O endereço do serviço de desencurtamento de urls
-    endpoint = "https://api.tinyurl.com/alias" + '/tinyurl.com/' + alias
-    # As credenciais para acessar o serviço
-
-   
-    # Realizando a requisição
-    response = requests.get(endpoint, headers=headers)
-    #print(response.json())
+    response = requisicao('GET', f'/alias/{DOMINIO}/{alias}')
     return response.json()['data']
 
+def _proximoAlias(alias:str):
+    """
+    Incrementa o número no final do alias: 'defesa-AnSouza' -> 'defesa-AnSouza1' -> 'defesa-AnSouza2'.
+    """
+    # Verifica se o alias já possui um número no final e incrementa o contador
+    base = alias.rstrip(string.digits)
+    contador = int(alias[len(base):] or 0)
+    return base + str(contador + 1)
+
+# Aliases escolhidos por encurtamentos em andamento: {alias: url}
+_reservados = {}
+
+def _reservarAlias(alias:str, url:str):
+    """
+    Escolhe o primeiro alias da sequência que, pelo cache local, está livre ou já aponta para a URL, e o reserva
+    para que outra thread não o escolha para outra URL. Aliases de entradas antigas, sem destino, contam como livres.
+    """
+    with _travaCache:
+        _carregarCache()
+        while _aliases.get(alias, url) != url or _reservados.get(alias, url) != url:
+            alias = _proximoAlias(alias)
+        _reservados[alias] = url
+        return alias
+
 def shorten_url(url:str, alias:str=None):
     """
     Encurta uma URL usando o serviço de encurtamento de URLs.
+    Colisões de alias são resolvidas primeiro pelo cache local, de modo que normalmente a API é chamada uma única vez.
 
     Parâmetros:
         url (str): A URL que será encurtada.
@@ -86,47 +299,67 @@ def shorten_url(url:str, alias:str=None):
     >>> shorten_url("https://www.example.com")
     "https://tinyurl.com/abc123"
     """
-    
-    # O endereço do serviço de encurtamento de urls
-    cachedURL = get_alias_from_cache(alias)
-    if cachedURL == url: # A URL já está encurtada e corresponde ao link desejado
-        return 'https://tinyurl.com/' + alias
-    
-    # O payload da requisição
-    payload = {
-        "url": url,
-        "domain": "tinyurl.com",
-        "alias": alias if alias else "",
-    }
 
-    # Realizando a requisição
-    response = requests.post("https://api.tinyurl.com/create", headers=headers, json=payload)
-    
-    # Verificando se houve algum erro na requisição
-    if response.status_code != 200:
-        # Verificando se o alias já está em uso
-        if  'Alias is not available.' in response.json()['errors']:
+    # A URL já foi encurtada, com este ou com outro alias
+    cachedAlias = get_alias_for_url(url)
+    if cachedAlias:
+        return f'https://{DOMINIO}/' + cachedAlias
+
+    # Offline, o alias reservado não é liberado: ele continua apontando para a URL até o fim da execução
+    if OFFLINE:
+        return f'https://{DOMINIO}/' + (_reservarAlias(alias, url) if alias else hashlib.sha1(url.encode()).hexdigest()[:8])
+
+    while True:
+        reservado = _reservarAlias(alias, url) if alias else None
+        try:
+            if reservado and get_alias_from_cache(reservado) == url: # A URL já está encurtada e corresponde ao link desejado
+                return f'https://{DOMINIO}/' + reservado
+
+            # O alias foi criado por uma versão anterior, que não guardava o destino: consulta e migra a entrada
+            with _travaCache:
+                legado = reservado in _legados
+            if legado:
+                urlData = unshorten_url(reservado)
+                update_aliases_cache(reservado, urlData['url'])
+                if urlData['url'] == url:
+                    return f'https://{DOMINIO}/' + reservado
+                alias = _proximoAlias(reservado)
+                continue
+
+            # O payload da requisição
+            payload = {
+                "url": url,
+                "domain": DOMINIO,
+                "alias": reservado if reservado else "",
+            }
+
+            # Realizando a requisição
+            response = requisicao('POST', '/create', json=payload)
+
+            # Verificando se houve algum erro na requisição
+            if response.status_code == 200:
+                # Retornando a url encurtada e guardando o destino do alias
+                tiny_url = response.json()['data']['tiny_url']
+                update_aliases_cache(tiny_url.rsplit('/', 1)[-1], url)
+                return tiny_url
+
+            # Verificando se o alias já está em uso por um link que não está no cache
+            if not reservado or 'Alias is not available.' not in response.json()['errors']:
+                raise Exception(f'Erro ao encurtar a URL: {response.json()}')
+
             # Se o alias já está em uso e este aponta para a url desejada, retorna o link
-            urlData = unshorten_url(alias)
-            if urlData['url'] == url and (urlData['user']['email'] == tinyurl['email']):
-                return 'https://tinyurl.com/' + alias
-            else:
-                # Se o alias já está em uso e aponta para outra url, imprime um aviso e tenta encurtar a url novamente
-                cprint(f'Alias {alias} já está em uso e aponta para {urlData["url"]}. ', 'yellow')
-
-                contador = 0
-                # Verifica se o alias já possui um número no final e incrementa o contador
-                while(alias[-1].isdigit()):
-                    contador = contador*10 + int(alias[-1])
-                    alias = alias[:-1]
-                return shorten_url(url, alias + str(contador + 1))
-        else:
-            # Se houve outro erro, imprime o erro e retorna None
-            raise Exception('Erro ao encurtar a URL: ' + response.json())
-
-    # Retornando a url encurtada
-    update_aliases_cache(alias, response.json()['data']['tiny_url'])
-    return response.json()['data']['tiny_url']
+            urlData = unshorten_url(reservado)
+            update_aliases_cache(reservado, urlData['url'])
+            if urlData['url'] == url and (urlData['user']['email'] == credenciais()['email']):
+                return f'https://{DOMINIO}/' + reservado
+
+            # Se o alias já está em uso e aponta para outra url, imprime um aviso e tenta o próximo alias
+            cprint(f'Alias {reservado} já está em uso e aponta para {urlData["url"]}. ', 'yellow')
+            alias = _proximoAlias(reservado)
+        finally:
+            if reservado:
+                with _travaCache:
+                    _reservados.pop(reservado, None)
 
 
 def update_url(url:str, alias:str):
@@ -145,20 +378,28 @@ def update_url(url:str, alias:str):
     
     payload = {
         "alias": alias,
-        "domain": "tinyurl.com",
+        "domain": DOMINIO,
         "url": url
     }
     if(alias == None or len(alias) == 0):
         return None
 
     # Realizando a requisição para atualizar a url
-    response = requests.patch('https://api.tinyurl.com/change', headers=headers, json=payload)
+    response = requisicao('PATCH', '/change', json=payload)
     if(response.status_code != 200):
         cprint(response.json(), 'red')
         return None    
     
     update_aliases_cache(alias, url)
-    return "https://tinyurl.com/" + alias
+    return f'https://{DOMINIO}/' + alias
+
+
+def aliasDefesa(aluno:str):
+    """
+    Cria o alias da url de defesa de um aluno, no formato 'defesa-[iniciaisDoNome][sobrenomeDoAluno]'.
+    """
+    aluno = unidecode(aluno)
+    return 'defesa-' + aluno.split(' ')[0][:2] + aluno.split(' ')[-1][:15]
 
 
 def encurtarURLDefesa(link:str, aluno:str=None):
@@ -174,12 +415,41 @@ def encurtarURLDefesa(link:str, aluno:str=None):
     """
     if(aluno == None):
         return shorten_url(link)
-    
-    aluno = unidecode(aluno)
-    nomes = aluno.split(' ')
-    for i in range(len(nomes)-1):
-        nomes[i] = nomes[i][:2]
 
-    # Cria um alias para a url no formato 'defesa-[iniciaisDoNome][sobrenomeDoAluno]'
-    alias = 'defesa-' + aluno.split(' ')[0][:2] + aluno.split(' ')[-1][:15]
-    return shorten_url(link, alias)
+    return shorten_url(link, aliasDefesa(aluno))
+
+
+def encurtarURLsDefesa(pedidos:list, progresso = None, processos:int = 4):
+    """
+    Encurta várias urls de defesa ao mesmo tempo. Pedidos repetidos são encurtados uma única vez, e as
+    requisições respeitam o limite de taxa da API.
+
+    Args:
+        pedidos (list): Pares (link, aluno), como em encurtarURLDefesa.
+        progresso (callable, optional): Chamada com ('encurtar', atual, total) antes do primeiro e depois de cada link encurtado.
+            Se ela levantar uma exceção, os links que ainda não começaram a ser encurtados são descartados.
+        processos (int, optional): O número máximo de requisições simultâneas.
+
+    Returns:
+        dict: {(link, aluno): url encurtada}
+    """
+    pedidos = list(dict.fromkeys(pedidos))
+    encurtados = {}
+    if not pedidos:
+        return encurtados
+
+    if progresso:
+        progresso('encurtar', 0, len(pedidos))
+
+    with ThreadPoolExecutor(max_workers=min(processos, len(pedidos)), thread_name_prefix='encurtador') as executor:
+        futuros = {executor.submit(encurtarURLDefesa, link, aluno): (link, aluno) for link, aluno in pedidos}
+        try:
+            for futuro in as_completed(futuros):
+                encurtados[futuros[futuro]] = futuro.result()
+                if progresso:
+                    progresso('encurtar', len(encurtados), len(pedidos))
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return encurtados
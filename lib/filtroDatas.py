@@ -0,0 +1,98 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+def ordinal(data:str):
+    """
+    Converte uma data no formato dd/mm/aaaa no número do dia, usado como chave de ordenação e de consulta.
+
+    Exemplo:
+    >>> ordinal('01/01/2025') - ordinal('31/12/2024')
+    1
+    """
+    dia, mes, ano = data.split('/')
+    return datetime.date(int(ano), int(mes), int(dia)).toordinal()
+
+
+class IndiceDatas:
+    """
+    Defesas ordenadas por data, com os números dos dias em um vetor paralelo, de modo que a busca por um
+    período seja feita com duas buscas binárias.
+
+    Exemplo:
+    >>> indice = IndiceDatas(tccs)
+    >>> indice.periodo('01/07/2025', 6)
+    [{'Aluno': ..., 'Data': '02/07/2025', ...}, ...]
+    """
+
+    def __init__(self, defesas:list, ordinais:list = None):
+        """
+        Parâmetros:
+        - defesas (list): As defesas, com a data no formato dd/mm/aaaa.
+        - ordinais (list, optional): Os números dos dias das defesas, se elas já estiverem ordenadas por data.
+        """
+        if ordinais is None:
+            pares = sorted(((ordinal(d['Data']), d.get('Hora', '')), i) for i, d in enumerate(defesas))
+            ordinais = [chave[0] for chave, _ in pares]
+            defesas = [defesas[i] for _, i in pares]
+
+        self.ordinais = array('l', ordinais)
+        self.defesas = list(defesas)
+
+    def __len__(self):
+        return len(self.defesas)
+
+    def intervalo(self, inicio:int, fim:int):
+        """
+        Retorna as defesas entre os dias inicio e fim, inclusive, ordenadas por data e hora.
+        """
+        return self.defesas[bisect_left(self.ordinais, inicio):bisect_right(self.ordinais, fim)]
+
+    def periodo(self, data_inicio:str, intervalo:int):
+        """
+        Retorna as defesas entre a data de início e o fim do intervalo, inclusive, ordenadas por data e hora.
+
+        Parâmetros:
+        - data_inicio (str): A data de início no formato dd/mm/aaaa.
+        - intervalo (int): O intervalo de dias.
+        """
+        inicio = ordinal(data_inicio)
+        return self.intervalo(inicio, inicio + int(intervalo))
+
+
+def noIntervalo(elemento:dict, data_inicio:str, intervalo:int):
+    """
+    Verifica se a defesa acontece entre a data de início e o fim do intervalo, inclusive.
+
+    Args:
+        elemento (dict): A defesa, com a data no formato dd/mm/aaaa.
+        data_inicio (str): A data de início no formato dd/mm/aaaa.
+        intervalo (int): O intervalo de dias.
+
+    Returns:
+        bool: True se a defesa está dentro do intervalo.
+    """
+    inicio = ordinal(data_inicio)
+    return inicio <= ordinal(elemento['Data']) <= inicio + int(intervalo)
+
+
+def filtrarPeriodo(defesas:list, data_inicio:str, intervalo:int):
+    """
+    Seleciona as defesas que acontecem entre a data de início e o fim do intervalo.
+    Para várias consultas sobre as mesmas defesas, use IndiceDatas.
+
+    Args:
+        defesas (list): As defesas carregadas de um arquivo no formato de data/TCCs.json.
+        data_inicio (str): A data de início no formato dd/mm/aaaa.
+        intervalo (int): O intervalo de dias.
+
+    Returns:
+        list: As defesas dentro do intervalo, ordenadas por data e hora.
+    """
+    return IndiceDatas(defesas).periodo(data_inicio, intervalo)
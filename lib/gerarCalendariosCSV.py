@@ -8,6 +8,7 @@ import datetime
 import os
 import json
 from enum import Enum
+from lib.bancoTCCs import abrirBanco, todosTCCs
 
 def add30min(str):
     end_time = datetime.datetime.strptime(str, '%H:%M').time()
@@ -98,22 +99,28 @@ def gerarCalendariosCSV(tipo:list, modo:list):
         for modo in modo:
             fileName = ['TCCs', 'defesas', 'teses'][tipo] + ['-novos', '-atualizados', ''][modo] + '.json'
 
-            # Carrega os dados
-            with open('./data/' + fileName, 'r', encoding='utf-8') as f:
-                dados = json.load(f)
-                for linha in dados:
-                    writer.writerow(dadosParaLinha(linha))
-
-                print('Calendário gerado com sucesso!')
-                if(len(dados) == 0):
-                    print('Nenhum evento foi adicionado ao calendário')
-                else:
-                    print(f'{len(dados)} eventos foram adicionados ao calendário\n')
-
-                if(modo == 2):
-                    print('- Lembre-se de REMOVER os eventos antigos do CALENDÁRIO manualmente!')
-                if(modo == 1 or modo == 2):
-                    print(f'- Lembre-se de ATUALIZAR o arquivo {fileName} para evitar duplicatas!')
+            # Carrega os dados. Todos os TCCs são lidos do banco; os demais, dos arquivos JSON
+            if(fileName == 'TCCs.json'):
+                banco = abrirBanco()
+                dados = todosTCCs(banco)
+                banco.close()
+            else:
+                with open('./data/' + fileName, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+
+            for linha in dados:
+                writer.writerow(dadosParaLinha(linha))
+
+            print('Calendário gerado com sucesso!')
+            if(len(dados) == 0):
+                print('Nenhum evento foi adicionado ao calendário')
+            else:
+                print(f'{len(dados)} eventos foram adicionados ao calendário\n')
+
+            if(modo == 2):
+                print('- Lembre-se de REMOVER os eventos antigos do CALENDÁRIO manualmente!')
+            if(modo == 1 or modo == 2):
+                print(f'- Lembre-se de ATUALIZAR o arquivo {fileName} para evitar duplicatas!')
 
 
     CSVFile.close()
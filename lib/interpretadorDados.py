@@ -3,11 +3,12 @@ DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e
 Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
 """
 
-from bs4 import BeautifulSoup
+import datetime
+import html
 import re
-from lib.encurtador_tinyURL import encurtarURLDefesa
+from lib.encurtador_tinyURL import encurtarURLDefesa, encurtarURLsDefesa, flush_aliases_cache
 
-def intepretarDados(tipo:str, origem:str, conteudo:str):
+def intepretarDados(tipo:str, origem:str, conteudo:str, progresso = None):
     if(tipo == 'pos'):
         if(origem == 'html'):
             return None
@@ -18,7 +19,7 @@ def intepretarDados(tipo:str, origem:str, conteudo:str):
     
     elif(tipo == 'tcc'):
         if(origem == 'html'):
-            return htmlTCC(conteudo)
+            return htmlTCC(conteudo, progresso)
         elif(origem == 'email'):
             return emailTCC(conteudo)
         else:
@@ -27,12 +28,174 @@ def intepretarDados(tipo:str, origem:str, conteudo:str):
         return None
     
 
-def htmlTCC(html_content):
+# Expressões usadas na leitura da tabela de TCCs do portal
+_ETIQUETA = re.compile(r"""<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)((?:"[^"]*"|'[^']*'|[^'">])*)>""", re.DOTALL)
+_HREF = re.compile(r"""\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+_SEPARADOR_BANCA = re.compile(r' ?- ')
+_DATA = re.compile(r'\d{2}\/\d{2}\/\d{4}')
+_HORA = re.compile(r'\d{2}:\d{2}')
+_TABELA = re.compile(r'<table', re.IGNORECASE)
+
+# Tamanho dos blocos entregues ao leitor da tabela
+_BLOCO = 64 * 1024
+
+
+class LeitorTabela:
+    """
+    Leitor incremental das linhas de tabelas HTML. Guarda apenas o texto das células <td> e o primeiro link de
+    cada célula; o que está fora de <table> é ignorado. As etiquetas são localizadas por uma única expressão
+    regular, sem montar a árvore do documento.
+
+    As linhas lidas ficam em `linhas` como listas de (texto, link) até serem consumidas.
+    """
+
+    def __init__(self):
+        self.linhas = []
+        self.totalLinhas = 0   # Total de <tr>, incluindo o cabeçalho
+        self._tabelas = 0
+        self._linha = None
+        self._celula = None
+        self._link = None
+        self._resto = ''
+
+    def _fecharCelula(self):
+        if self._celula is not None:
+            self._linha.append((html.unescape(''.join(self._celula)), self._link))
+            self._celula = None
+
+    def _fecharLinha(self):
+        if self._linha is not None:
+            self._fecharCelula()
+            self.linhas.append(self._linha)
+            self._linha = None
+
+    def _etiqueta(self, fechamento, tag, atributos):
+        tag = tag.lower()
+        if tag == 'table':
+            if fechamento:
+                self._fecharLinha()
+                self._tabelas -= 1
+            else:
+                self._tabelas += 1
+        elif not self._tabelas:
+            return
+        elif tag == 'tr':
+            self._fecharLinha()
+            if not fechamento:
+                self._linha = []
+                self.totalLinhas += 1
+        elif tag in ('td', 'th') and self._linha is not None:
+            self._fecharCelula()
+            if tag == 'td' and not fechamento:
+                self._celula = []
+                self._link = None
+        elif tag == 'a' and not fechamento and self._celula is not None and self._link is None:
+            href = _HREF.search(atributos)
+            if href:
+                self._link = html.unescape(next(g for g in href.groups() if g is not None))
+
+    def _ler(self, texto):
+        posicao = 0
+        for m in _ETIQUETA.finditer(texto):
+            if self._celula is not None and m.start() > posicao:
+                self._celula.append(texto[posicao:m.start()])
+            posicao = m.end()
+            if m.group(2):
+                self._etiqueta(m.group(1), m.group(2), m.group(3))
+        if self._celula is not None and posicao < len(texto):
+            self._celula.append(texto[posicao:])
+
+    def feed(self, bloco:str):
+        """
+        Lê mais um bloco do HTML. Uma etiqueta incompleta no fim do bloco é guardada para o próximo.
+        """
+        texto = self._resto + bloco
+        corte = texto.rfind('<')
+        comentario = texto.rfind('<!--')
+        if comentario != -1 and texto.find('-->', comentario + 4) == -1:
+            corte = comentario
+        if corte != -1 and len(texto) - corte < _BLOCO and not _ETIQUETA.match(texto, corte):
+            texto, self._resto = texto[:corte], texto[corte:]
+        else:
+            self._resto = ''
+        self._ler(texto)
+
+    def close(self):
+        """
+        Lê o que restou do HTML e encerra a última linha.
+        """
+        self._ler(self._resto)
+        self._resto = ''
+        self._fecharLinha()
+
+
+def linhasTCC(html_content):
+    """
+    Lê a tabela de TCCs do portal e gera um dicionário por linha, sem encurtar os links das defesas remotas.
+    O HTML é lido em blocos a partir da primeira tabela, e cada linha é entregue assim que termina.
+
+    Parâmetros:
+    - html_content (str | iterable): O conteúdo HTML da página, ou os blocos de texto em que ele chega.
+
+    Retorna:
+    - generator: Os dicionários com os dados de cada TCC, como em htmlTCC.
+    """
+    if isinstance(html_content, str):
+        inicio = _TABELA.search(html_content)
+        html_content = html_content[inicio.start():] if inicio else ''
+        blocos = (html_content[i:i + _BLOCO] for i in range(0, len(html_content), _BLOCO))
+    else:
+        blocos = html_content
+
+    leitor = LeitorTabela()
+    pendentes = []
+    for bloco in blocos:
+        leitor.feed(bloco)
+        pendentes += leitor.linhas
+        leitor.linhas.clear()
+
+        # Páginas com até duas linhas não têm TCCs, então as linhas só são entregues a partir da terceira
+        if leitor.totalLinhas > 2:
+            yield from _dadosLinhas(pendentes)
+            pendentes.clear()
+
+    leitor.close()
+    pendentes += leitor.linhas
+    if leitor.totalLinhas > 2:
+        yield from _dadosLinhas(pendentes)
+
+
+def _dadosLinhas(linhas):
+    for cols in linhas:
+        if(len(cols) == 0):
+            continue # pula o cabeçalho
+
+        dados = {
+            'Curso': cols[2][0],
+            'Aluno': cols[3][0],
+            'Orientador': cols[4][0],
+            'Coorientador': cols[5][0],
+            'Titulo': cols[6][0],
+            'Banca': _SEPARADOR_BANCA.split(cols[7][0].strip())[1:],
+            'Data': _DATA.search(cols[0][0])[0],
+            'Hora': _HORA.search(cols[0][0])[0]
+        }
+
+        if(cols[1][0].startswith('REMOTO:')):
+            dados['Local'] = cols[1][1]
+        else:
+            dados['Local'] = cols[1][0].split(':')[1]
+
+        yield dados
+
+
+def htmlTCC(html_content, progresso = None):
     """
     Extrai informações de um conteúdo HTML e retorna uma lista de dicionários contendo os dados extraídos.
 
     Parâmetros:
     - html_content (str): O conteúdo HTML a ser analisado.
+    - progresso (callable, opcional): Chamada com ('encurtar', atual, total) durante o encurtamento dos links.
 
     Retorna:
     - linhas (list): Uma lista de dicionários contendo os dados extraídos do conteúdo HTML.
@@ -43,41 +206,34 @@ def htmlTCC(html_content):
     >>> print(dados)
     [{'Curso': 'Engenharia de Software', 'Aluno': 'João Silva', 'Orientador': 'Maria Santos', ...}, ...]
     """
-    soup = BeautifulSoup(html_content, 'lxml')
-    linhas = []
-    
-    if(len(soup.find_all('tr')) <= 2):
-            return []
+    linhas = list(linhasTCC(html_content))
 
-    for rows in soup.find_all('tr'):
+    # Encurta de uma vez as URLs que ainda não foram encurtadas
+    remotas = [dados for dados in linhas if dados['Local'].startswith('http') and not dados['Local'].startswith('https://tinyurl.com')]
+    encurtados = encurtarURLsDefesa([(dados['Local'], dados['Aluno']) for dados in remotas], progresso)
+    for dados in remotas:
+        dados['Local'] = encurtados[(dados['Local'], dados['Aluno'])]
+    flush_aliases_cache()
 
-        cols = rows.find_all('td')
-        if(len(cols) == 0):
-            continue # pula o cabeçalho
-        
-        dados = {
-            'Curso': cols[2].text,
-            'Aluno': cols[3].text,
-            'Orientador': cols[4].text,
-            'Coorientador': cols[5].text,
-            'Titulo': cols[6].text,
-            'Banca': re.split(r' ?- ', cols[7].text.strip())[1:],
-            'Data': re.search(r'\d{2}\/\d{2}\/\d{4}', cols[0].text)[0],
-            'Hora': re.search(r'\d{2}:\d{2}', cols[0].text)[0]
-        }
-
-        if(cols[1].text.startswith('REMOTO:')):
-            dados['Local'] = cols[1].find('a')['href']
-            # Verifica se a URL já foi encurtada e encurta se necessário
-            if(not dados['Local'].startswith('https://tinyurl.com')):
-                dados['Local'] = encurtarURLDefesa(dados['Local'], dados['Aluno'])
-        else:
-            dados['Local'] = cols[1].text.split(':')[1]
-        
-        linhas.append(dados)
-        
     return linhas
 
+# Campos dos emails de defesas de TCC
+_EMAIL_TCC = re.compile(r'\n{0,}\s{0,}Alun(o|a): +(?P<aluno>.+?)$\n{0,}\s{0,}Título( do Trabalho)?: +(?P<titulo>.+?)$\n{0,}\s{0,}Orientador(a?)(es)?: +(?P<orientador>.+?)$(\n{0,}\s{0,}Coorientador(a?)(es)?: +(?P<coorientador>.+?)$)?\n{0,}\s{0,}Banca: +(?P<banca>.+?)$\n{0,}\s{0,}Data: +(?P<data>.+?)$\n{0,}\s{0,}(Link|Sala): +(?P<local>.*?)$', re.MULTILINE)
+# Data e hora do campo Data dos emails de TCC, como "25/06/2025 às 14h" ou "25/06/2025 - 14h30"
+_DATA_TCC = re.compile(r'(?P<data>\d{2}/\d{2}/\d{4}) +\S+ +(?P<hora>\d{1,2}(?:[h:]\d{0,2})?)', re.IGNORECASE)
+
+
+def _dataValida(data:str):
+    """
+    Verifica se o texto dd/mm/aaaa é uma data que existe no calendário.
+    """
+    try:
+        datetime.datetime.strptime(data, '%d/%m/%Y')
+    except ValueError:
+        return False
+    return True
+
+
 def emailTCC(fileName, curso):
     """
     Extrai informações de um arquivo de email contendo dados de TCCs.
@@ -99,34 +255,95 @@ def emailTCC(fileName, curso):
                 - 'Hora': A hora da defesa.
                 - 'Local': O local da defesa.
     """
-    # Regex para consulta no e-mail.
-    
-    r = r'\n{0,}\s{0,}Alun(o|a): +(?P<aluno>.+?)$\n{0,}\s{0,}Título( do Trabalho)?: +(?P<titulo>.+?)$\n{0,}\s{0,}Orientador(a?)(es)?: +(?P<orientador>.+?)$(\n{0,}\s{0,}Coorientador(a?)(es)?: +(?P<coorientador>.+?)$)?\n{0,}\s{0,}Banca: +(?P<banca>.+?)$\n{0,}\s{0,}Data: +(?P<data>.+?)$\n{0,}\s{0,}(Link|Sala): +(?P<local>.*?)$'
-    lista = []
     with open(fileName, 'r', encoding='utf-8') as file:
-        content = file.read()
-        matches = re.finditer(r, content, re.MULTILINE)
+        return list(textoTCC(file.read(), curso))
+
+
+def textoTCC(content:str, curso:str):
+    """
+    Extrai os TCCs do texto de um email, um a um. Ver emailTCC.
+
+    Args:
+        content (str): O texto do email.
+        curso (str): O nome do curso.
 
-        for match in matches:
-            m = match.groupdict()
-            dados = {
-                'Curso': curso,
-                'Aluno': m['aluno'].title(),
-                'Orientador': m['orientador'] if m['orientador'] else '',
-                'Coorientador': m['coorientador'] if m['coorientador'] else '',
-                'Titulo': m['titulo'].replace('_', ' '),
-                'Banca': m['banca'].split(', '),
-                'Data': m['data'].split(' ')[0],
-                'Hora': m['data'].split(' ')[2].lower().replace('h', ':'),
-                'Local': re.sub(r'\[\d+\]', '', m['local']).strip
-            }
+    Returns:
+        generator: Um dicionário por TCC.
+
+    Um TCC cujo campo Data não tem uma data dd/mm/aaaa válida seguida do horário (como "a definir") é ignorado,
+    sem interromper a leitura dos demais.
+    """
+    for match in _EMAIL_TCC.finditer(content):
+        m = match.groupdict()
+        data = _DATA_TCC.match(m['data'])
+        if data is None or not _dataValida(data['data']):
+            print(f'TCC ignorado ({m["aluno"].title()}): data inválida "{m["data"]}"')
+            continue
+
+        dados = {
+            'Curso': curso,
+            'Aluno': m['aluno'].title(),
+            'Orientador': m['orientador'] if m['orientador'] else '',
+            'Coorientador': m['coorientador'] if m['coorientador'] else '',
+            'Titulo': m['titulo'].replace('_', ' '),
+            'Banca': m['banca'].split(', '),
+            'Data': data['data'],
+            'Hora': data['hora'].lower().replace('h', ':'),
+            'Local': re.sub(r'\[\d+\]', '', m['local']).strip()
+        }
+
+        if dados['Hora'].endswith(':'):
+            dados['Hora'] += '00'
 
-            if dados['Hora'].endswith(':'):
-                dados['Hora'] += '00'
+        yield dados
 
-            lista.append(dados)
 
-    return lista
+# Rótulos dos campos dos emails de defesa da pós, procurados em cada linha do email
+_ROTULOS_POS = re.compile(r'(?P<tipo_defesa>DEFESA DE +)|(?P<aluno>Alun(?:o\(a\)|o|a): )|(?P<coorientador>Coorientador(?:\(a\)|a)?: )'
+                          r'|(?P<orientador>Orientador(?:\(a\)|a)?: )|(?P<titulo>Título: )|(?P<data>Data: )|(?P<horario>Horário: |Hora: )'
+                          r'|(?P<local>Local: )', re.IGNORECASE)
+_DATA_POS = re.compile(r'\d{2}\/\d{2}\/\d{4}')
+_HORARIO_POS = re.compile(r'\d{1,2}(?:h|\:)\d{2}(?:min)?', re.IGNORECASE)
+_OBRIGATORIOS_POS = ('tipo_defesa', 'aluno', 'orientador', 'titulo', 'data', 'horario', 'local')
+
+
+def camposEmailPos(content:str):
+    """
+    Lê os campos rotulados de um email de defesa da pós (DEFESA DE, Aluno(a), Orientador(a), Coorientador(a), Título,
+    Data, Horário e Local) percorrendo o email uma única vez, linha a linha. Os campos podem aparecer em qualquer
+    ordem; quando um campo se repete, como em respostas com citação, vale a primeira ocorrência válida.
+
+    Args:
+        content (str): O conteúdo do email.
+
+    Returns:
+        dict: O texto de cada campo, ou None se faltar algum campo obrigatório. O coorientador é opcional.
+    """
+    campos = {}
+    for linha in content.split('\n'):
+        for rotulo in _ROTULOS_POS.finditer(linha):
+            campo = rotulo.lastgroup
+            if campo in campos:
+                continue
+            valor = linha[rotulo.end():]
+
+            # A data ocupa o resto da linha, e o horário é lido até onde tiver o formato esperado
+            if campo == 'data':
+                if _DATA_POS.fullmatch(valor) is None:
+                    continue
+            elif campo == 'horario':
+                horario = _HORARIO_POS.match(valor)
+                if horario is None:
+                    continue
+                valor = horario[0]
+            elif not valor:
+                continue
+            campos[campo] = valor
+
+    if any(campo not in campos for campo in _OBRIGATORIOS_POS):
+        return None
+    campos.setdefault('coorientador', None)
+    return campos
 
 
 def emailPos(content):
@@ -151,11 +368,7 @@ def emailPos(content):
                 - 'Local': O local da defesa.
     """
 
-    # Regex para extrair os dados
-    regex = r'\n{0,}\s{0,}DEFESA DE +(?P<tipo_defesa>.+?)$(?:\n|.)+Alun(?:o\(a\)|o|a): (?P<aluno>.+?)$(?:\n|.)+?Orientador(?:\(a\)|a)?: (?P<orientador>.+?)$(?:(?:\n|.)+Coorientador(?:\(a\)|a)?: (?P<coorientador>.+?)$)?(?:\n|.)+Título: (?P<titulo>.+?)$(?:\n|.)+(?:Data: (?P<data>\d{2}\/\d{2}\/\d{4}))$(?:\n|.)+(?:Horário|Hora): (?P<horario>\d{1,2}(?:h|\:)\d{2}(min)?)(?:\n|.)+Local: (?P<local>.+?)$'
-
-    m = re.search(regex, content, re.MULTILINE | re.IGNORECASE)
-            
+    m = camposEmailPos(content)
     if(not m):
         raise ValueError('Não foi possível encontrar os dados da defesa no email.')
 
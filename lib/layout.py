@@ -0,0 +1,234 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+"""
+    Modelos declarativos das imagens.
+
+    Cada modelo é descrito uma única vez por um dicionário com o fundo, os elementos do cabeçalho e os
+    elementos repetidos para cada registro (defesa). O modelo é compilado em um plano, com as fontes e os
+    ícones já carregados, e o mesmo plano é usado para todas as imagens geradas com ele.
+
+    Exemplo de modelo:
+    {
+        'nome': 'TCC_feed',
+        'fundo': 'tcc/fundo-feed.png',
+        'cabecalho': [('texto', (78, 325), {'campo': 'Curso', 'fonte': ('JosefinSans/Bold.ttf', 35), ...})],
+        'registros': {
+            'origem': (0, 232),   # Posição do primeiro registro
+            'passo': 255,         # Distância vertical entre registros
+            'elementos': [('nome', (70, 0), {'campo': 'Aluno', ...}), ...]
+        }
+    }
+
+    Cada elemento é uma tupla (tipo, posição, parâmetros), com a posição relativa à origem do registro.
+    Os parâmetros 'se' (campo que precisa estar preenchido) e 'deslocamento' (distância vertical somada aos
+    elementos seguintes quando o elemento é desenhado) valem para todos os tipos.
+"""
+
+import re
+from PIL import ImageDraw
+from lib.utils import getFont, getFundo, getIcone, textBox, truncarTexto, Alignment
+
+
+# Planos já compilados, indexados por (nome do modelo, escala do título)
+_planos = {}
+
+
+def formatarHora(hora:str):
+    """
+    Formata a hora para exibição nas imagens: '14:00' -> '14h00'.
+    """
+    return hora.replace(':', 'h')
+
+
+def _valor(registro:dict, parametros:dict):
+    """
+    Obtém o valor de um elemento a partir do registro, aplicando o formato, se houver.
+    """
+    valor = registro[parametros['campo']]
+    if 'formato' in parametros:
+        valor = parametros['formato'](valor)
+    return valor
+
+
+def _desenharTexto(img, d, pos, registro, p):
+    textBox(_valor(registro, p), d, p['fonte'], (pos[0] + p['caixa'][0], pos[1] + p['caixa'][1]) + tuple(p['caixa'][2:]),
+            spacing=p.get('spacing', 0), hAllign=p.get('hAllign', Alignment.LEFT), vAllign=p.get('vAllign', Alignment.TOP),
+            lineHeight=p.get('lineHeight', 1.3), fill=p.get('fill', (0,0,0)))
+
+
+def _desenharRetangulo(img, d, pos, registro, p):
+    x0, y0, x1, y1 = p['caixa']
+    d.rectangle((pos[0] + x0, pos[1] + y0, pos[0] + x1, pos[1] + y1), fill=p['fill'])
+
+
+def _desenharData(img, d, pos, registro, p):
+    """
+    Ícone de calendário ou relógio seguido da data ou hora.
+    """
+    icon, mask = p['icone']
+    img.paste(icon, pos, mask=mask)
+    _desenharTexto(img, d, pos, registro, p)
+
+
+def _desenharNome(img, d, pos, registro, p):
+    """
+    Seta seguida de um nome, com as palavras do meio removidas se ele não couber na largura limite.
+    """
+    icon, mask = p['icone']
+    img.paste(icon, pos, mask=mask)
+
+    texto = truncarTexto(p.get('prefixo', '') + _valor(registro, p), p['fonte'], p['limite'])
+    x, y, w, h = p['caixa']
+    textBox(texto, d, p['fonte'], (pos[0] + x, pos[1] + y, w, h), spacing=p.get('spacing', 0), vAllign=Alignment.TOP, fill=(0,0,0))
+
+
+def _desenharTitulo(img, d, pos, registro, p):
+    """
+    Ícone de caderno seguido do título do trabalho. Se 'curto' for informado como (largura, y), títulos que
+    cabem nessa largura usam o y alternativo.
+    """
+    icon, mask = p['icone']
+    img.paste(icon, (pos[0] + p['posIcone'][0], pos[1] + p['posIcone'][1]), mask=mask)
+
+    info = _valor(registro, p)
+    x, y, w, h = p['caixa']
+    if 'curto' in p and p['fonte'].getlength(info) <= p['curto'][0]:
+        y = p['curto'][1]
+
+    textBox(info, d, p['fonte'], (pos[0] + x, pos[1] + y, w, h), spacing=p.get('spacing', 0), hAllign=Alignment.LEFT,
+            vAllign=p.get('vAllign', Alignment.TOP), lineHeight=p.get('lineHeight', 1.3), fill=(0,0,0))
+
+
+def _desenharLocal(img, d, pos, registro, p):
+    """
+    Ícone de localização seguido da modalidade (Presencial, Online ou Híbrida) e do local ou link.
+    """
+    icon, mask = p['icone']
+    img.paste(icon, pos, mask=mask)
+
+    info = _valor(registro, p)
+    if(p.get('hibrida') and info.find('\n') != -1):
+        titulo = 'Híbrida'
+    elif(info.startswith('http')):
+        titulo = 'Online'
+    else:
+        titulo = 'Presencial'
+
+    # Remove o protocolo da URL
+    if(p.get('hibrida') or titulo == 'Online'):
+        info = re.sub(r'https?:\/\/', '', info)
+
+    _desenharTexto(img, d, pos, {'titulo': titulo}, {**p['titulo'], 'campo': 'titulo'})
+
+    i = p['info']
+    if 'caixa' in i:
+        _desenharTexto(img, d, pos, {'info': info}, {**i, 'campo': 'info'})
+    else:
+        d.text((pos[0] + i['pos'][0], pos[1] + i['pos'][1]), info, font=i['fonte'], fill=(0,0,0))
+
+
+ELEMENTOS = {
+    'texto': _desenharTexto,
+    'retangulo': _desenharRetangulo,
+    'data': _desenharData,
+    'nome': _desenharNome,
+    'titulo': _desenharTitulo,
+    'local': _desenharLocal,
+}
+
+
+def _compilarParametros(parametros:dict, escala=1):
+    """
+    Substitui as fontes e ícones declarados pelos objetos carregados.
+    """
+    compilado = {}
+    for chave, valor in parametros.items():
+        if chave == 'fonte':
+            nome, tamanho = valor[:2]
+            # Fontes marcadas com 'escala' acompanham a escala do título
+            compilado[chave] = getFont(nome, tamanho * escala if 'escala' in valor[2:] else tamanho)
+        elif chave == 'icone':
+            compilado[chave] = getIcone(valor, parametros['tamanho'])
+        elif isinstance(valor, dict):
+            compilado[chave] = _compilarParametros(valor, escala)
+        else:
+            compilado[chave] = valor
+    return compilado
+
+
+def _compilarElementos(elementos:list, escala=1):
+    plano = []
+    for tipo, pos, parametros in elementos:
+        if tipo == 'nome':
+            parametros = {'icone': 'seta.png', **parametros}
+        elif tipo == 'titulo':
+            parametros = {'icone': 'caderno.png', 'posIcone': (0, 0), **parametros}
+        elif tipo == 'local':
+            parametros = {'icone': 'local.png', **parametros}
+        plano.append((ELEMENTOS[tipo], pos, _compilarParametros(parametros, escala)))
+    return plano
+
+
+def compilarModelo(modelo:dict, escala=1):
+    """
+    Compila um modelo em um plano de renderização, carregando as fontes e os ícones uma única vez.
+    Os planos ficam em cache, de modo que cada modelo é compilado apenas uma vez por escala.
+
+    Parâmetros:
+    - modelo (dict): A descrição do modelo.
+    - escala (float): A escala do título (padrão: 1).
+
+    Retorna:
+    - dict: O plano de renderização.
+    """
+    chave = (modelo['nome'], escala)
+    plano = _planos.get(chave)
+    if plano is None:
+        registros = modelo.get('registros', {})
+        plano = _planos[chave] = {
+            'fundo': modelo['fundo'],
+            'cabecalho': _compilarElementos(modelo.get('cabecalho', []), escala),
+            'origem': registros.get('origem', (0, 0)),
+            'passo': registros.get('passo', 0),
+            'registros': _compilarElementos(registros.get('elementos', []), escala),
+        }
+    return plano
+
+
+def _desenharElementos(img, d, elementos, registro, origem):
+    x, y = origem
+    for desenhar, pos, parametros in elementos:
+        if 'se' in parametros and registro[parametros['se']] == "":
+            continue
+        desenhar(img, d, (x + pos[0], y + pos[1]), registro, parametros)
+        y += parametros.get('deslocamento', 0)
+    return y
+
+
+def renderizarModelo(modelo:dict, registros:list, valores:dict = None, escala=1):
+    """
+    Renderiza uma imagem a partir de um modelo.
+
+    Parâmetros:
+    - modelo (dict): A descrição do modelo.
+    - registros (list): As defesas, desenhadas uma abaixo da outra a partir da origem do modelo.
+    - valores (dict): Os valores usados pelos elementos do cabeçalho, como o curso e o semestre.
+    - escala (float): A escala do título (padrão: 1).
+
+    Retorna:
+    - Image: A imagem renderizada.
+    """
+    plano = compilarModelo(modelo, escala)
+    img = getFundo(plano['fundo'])
+    d = ImageDraw.Draw(img)
+
+    _desenharElementos(img, d, plano['cabecalho'], valores or {}, (0, 0))
+
+    x, y = plano['origem']
+    for registro in registros:
+        y = _desenharElementos(img, d, plano['registros'], registro, (x, y)) + plano['passo']
+
+    return img
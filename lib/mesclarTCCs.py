@@ -0,0 +1,146 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+import datetime
+import hashlib
+import json
+
+
+def semestre(data):
+    """
+    Obtém o semestre letivo de uma data: o primeiro vai de janeiro a maio e o segundo de junho a dezembro. É a mesma
+    regra do semestre padrão da interface gráfica e da linha de comando.
+
+    Args:
+        data (str | datetime.date): A data, como texto no formato dd/mm/aaaa ou como data.
+
+    Exemplo:
+    >>> semestre('15/07/2025')
+    '2025/2'
+    >>> semestre(datetime.date(2026, 1, 20))
+    '2026/1'
+    """
+    if isinstance(data, str):
+        _, mes, ano = (int(x) for x in data.split('/'))
+    else:
+        mes, ano = data.month, data.year
+    return f'{ano}/{1 if mes < 6 else 2}'
+
+
+def semestresVizinhos(semestre:str):
+    """
+    Retorna o semestre anterior e o seguinte, como ('2024/2', '2025/2') para '2025/1'.
+    """
+    ano, numero = (int(x) for x in semestre.split('/'))
+    if numero == 1:
+        return f'{ano - 1}/2', f'{ano}/2'
+    return f'{ano}/1', f'{ano + 1}/1'
+
+
+def identidade(tcc:dict):
+    """
+    Identifica um TCC pelo aluno, curso e semestre, de modo que o mesmo aluno possa ter defesas em semestres
+    diferentes sem que uma substitua a outra.
+    """
+    return (tcc['Aluno'], tcc['Curso'], semestre(tcc['Data']))
+
+
+def impressaoDigital(tcc:dict):
+    """
+    Resumo do conteúdo de um TCC, usado para saber se ele foi alterado sem compará-lo campo a campo.
+    """
+    conteudo = json.dumps(tcc, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def indexarTCCs(tccs:list):
+    """
+    Indexa os TCCs salvos pela identidade.
+
+    Returns:
+        dict: {identidade: (posição na lista, impressão digital)}
+    """
+    return {identidade(tcc): (i, impressaoDigital(tcc)) for i, tcc in enumerate(tccs)}
+
+
+def compararTCCs(indice:dict, obtidos:list, obterSalvo):
+    """
+    Compara os TCCs obtidos do portal com os TCCs salvos, sem alterá-los. Cada TCC obtido é localizado pela
+    identidade no índice e só é comparado campo a campo se a impressão digital mudou.
+
+    Um TCC obtido que não está no índice, mas cujo aluno e curso têm um TCC salvo no semestre vizinho que não
+    aparece no portal, é a mesma defesa com a data movida de um semestre para o outro: ele é tratado como
+    atualização desse TCC, e não como um TCC novo.
+
+    Args:
+        indice (dict): {identidade: (referência, impressão digital)} dos TCCs salvos.
+        obtidos (list): Os TCCs obtidos do portal. Se um TCC aparecer mais de uma vez, vale o último.
+        obterSalvo (callable): Recebe a referência do índice e retorna o TCC salvo.
+
+    Returns:
+        dict: As alterações, com as chaves:
+            - 'novos': Os TCCs que não estavam salvos.
+            - 'atualizados': Para cada TCC alterado, {'tcc': o TCC novo, 'campos': {campo: (valor antigo, valor novo)},
+              'anterior': a identidade do TCC salvo, que difere da do TCC novo se ele mudou de semestre}.
+            - 'removidos': Os TCCs salvos dos semestres obtidos que não estão mais no portal.
+    """
+    alteracoes = {'novos': [], 'atualizados': [], 'removidos': []}
+    obtidos = {identidade(tcc): tcc for tcc in obtidos}
+    movidos = set()
+
+    for chave, tcc in obtidos.items():
+        anterior = chave
+        if chave not in indice:
+            aluno, curso, semestreObtido = chave
+            vizinhos = [(aluno, curso, vizinho) for vizinho in semestresVizinhos(semestreObtido)]
+            anterior = next((vizinho for vizinho in vizinhos if vizinho in indice and vizinho not in obtidos and vizinho not in movidos), None)
+            if anterior is None:
+                alteracoes['novos'].append(tcc)
+                continue
+            movidos.add(anterior)
+
+        referencia, impressao = indice[anterior]
+        if impressaoDigital(tcc) == impressao:
+            continue
+
+        antigo = obterSalvo(referencia)
+        campos = {campo: (antigo.get(campo), tcc.get(campo)) for campo in antigo.keys() | tcc.keys() if antigo.get(campo) != tcc.get(campo)}
+        alteracoes['atualizados'].append({'tcc': tcc, 'campos': campos, 'anterior': anterior})
+
+    # Somente os semestres presentes no portal são considerados, para não apontar o histórico como removido
+    semestres = {chave[2] for chave in obtidos}
+    alteracoes['removidos'] = [obterSalvo(referencia) for chave, (referencia, _) in indice.items()
+                               if chave[2] in semestres and chave not in obtidos and chave not in movidos]
+
+    return alteracoes
+
+
+def mesclarTCCs(salvos:list, obtidos:list, indice:dict = None):
+    """
+    Mescla os TCCs obtidos do portal em uma lista de TCCs salvos, como a de data/TCCs.json.
+
+    Args:
+        salvos (list): Os TCCs salvos. A lista é alterada: TCCs novos são adicionados ao fim e TCCs alterados são substituídos.
+        obtidos (list): Os TCCs obtidos do portal.
+        indice (dict, optional): O índice de indexarTCCs, se já existir. É atualizado junto com a lista.
+
+    Returns:
+        dict: As alterações, como em compararTCCs. Os TCCs removidos são mantidos na lista.
+    """
+    if indice is None:
+        indice = indexarTCCs(salvos)
+
+    alteracoes = compararTCCs(indice, obtidos, salvos.__getitem__)
+
+    for tcc in alteracoes['novos']:
+        indice[identidade(tcc)] = (len(salvos), impressaoDigital(tcc))
+        salvos.append(tcc)
+    for alteracao in alteracoes['atualizados']:
+        tcc = alteracao['tcc']
+        posicao, _ = indice.pop(alteracao['anterior'])
+        salvos[posicao] = tcc
+        indice[identidade(tcc)] = (posicao, impressaoDigital(tcc))
+
+    return alteracoes
@@ -4,100 +4,222 @@ Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
 """
 
 
+import hashlib
 import json
+import os
+import time
 from termcolor import cprint
 import requests
 
 from lib.interpretadorDados import intepretarDados 
+from lib.bancoTCCs import BANCO, abrirBanco, mesclarBanco
 from lib.utils import get_credentials
 
 
-def obterNovosTCCs(echo = True, saveDiff = True):
+# Endereço do portal de serviços. PORTAL_INF permite usar um servidor local, como benchmarks/servidorPortal.py
+PORTAL = os.environ.get('PORTAL_INF', 'https://www.inf.ufrgs.br/portal').rstrip('/')
+
+# Cookies da sessão no portal e dados da última página importada, reaproveitados entre execuções
+SESSAO = './data/portal-sessao.json'
+
+
+def carregarSessao(s:requests.Session):
+    """
+    Carrega na sessão os cookies ainda válidos da última execução.
+
+    Returns:
+        dict: Os dados da última página importada: 'impressao', 'etag' e 'modificado'.
+    """
+    try:
+        with open(SESSAO, 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    agora = time.time()
+    for cookie in estado.pop('cookies', []):
+        if cookie.get('expires') is None or cookie['expires'] > agora:
+            s.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'],
+                          expires=cookie.get('expires'), secure=cookie.get('secure', False))
+    return estado
+
+
+def salvarSessao(s:requests.Session, estado:dict):
+    """
+    Salva os cookies da sessão e os dados da última página importada.
+    """
+    cookies = [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'expires': c.expires, 'secure': c.secure}
+               for c in s.cookies]
+    with open(SESSAO, 'w', encoding='utf-8') as f:
+        json.dump({**estado, 'cookies': cookies}, f, indent=4)
+
+
+def entrarNoPortal(s:requests.Session):
+    """
+    Inicia uma nova sessão no portal com as credenciais do arquivo credenciais.json.
+
+    Returns:
+        bool: Se o login foi aceito.
+    """
+    portal = get_credentials('portalServicosINF')
+    r = s.post(f'{PORTAL}/valida.php', data={'loginUsuario': portal['login'], 'senhaUsuario': portal['senha'], 'BtnLogin': '', 'redir': 'painel.php'}, timeout=30)
+    return r.url != f'{PORTAL}/login.php?action=loginFailed'
+
+
+def baixarPaginaTCCs(s:requests.Session, estado:dict):
+    """
+    Baixa a página de TCCs, pedindo ao portal que responda 304 se ela não mudou desde a última importação.
+
+    Returns:
+        Response: A resposta do portal, ou None se a sessão expirou.
+    """
+    cabecalhos = {}
+    if estado.get('etag'):
+        cabecalhos['If-None-Match'] = estado['etag']
+    if estado.get('modificado'):
+        cabecalhos['If-Modified-Since'] = estado['modificado']
+
+    r = s.get(f'{PORTAL}/apps/TCC-Grad/comunica.php', headers=cabecalhos, timeout=30)
+    # Com a sessão expirada, o portal redireciona para a página de login
+    if 'login.php' in r.url:
+        return None
+    return r
+
+
+class ImportacaoCancelada(Exception):
+    """
+    Interrompe a importação quando o cancelamento é pedido.
+    """
+
+
+def obterNovosTCCs(echo = True, saveDiff = True, forcar = False, progresso = None, cancelar = None):
     """
-    Função que obtém os TCCs do portal de serviços do INF e verifica se há novos TCCs ou TCCs atualizados
+    Função que obtém os TCCs do portal de serviços do INF e verifica se há novos TCCs ou TCCs atualizados.
+    A sessão no portal é reaproveitada entre execuções, e a página só é interpretada se mudou desde a última importação.
 
     Args:
         echo (bool, optional): Se deve imprimir mensagens na tela. Defaults to True
+        forcar (bool, optional): Interpreta a página mesmo que ela não tenha mudado. Defaults to False
+        progresso (callable, optional): Chamada a cada etapa com (etapa, atual, total). As etapas são 'login', 'pagina',
+            'interpretar', 'encurtar' (atual e total contam os links) e 'salvar'.
+        cancelar (threading.Event, optional): Quando definido, a importação é interrompida na próxima etapa, antes de
+            alterar o banco.
+
+    Returns:
+        dict: A mensagem do resultado, com a chave 'success', 'error' ou 'cancelado'.
     """
-        
-    portal = get_credentials('portalServicosINF')
-    content = ''
+
+    def etapa(nome, atual = 0, total = 0):
+        if cancelar is not None and cancelar.is_set():
+            raise ImportacaoCancelada()
+        if progresso is not None:
+            progresso(nome, atual, total)
+
+    try:
+        return _importarTCCs(echo, saveDiff, forcar, etapa)
+    except ImportacaoCancelada:
+        if(echo):
+            cprint('Importação cancelada', 'yellow')
+        return {'cancelado': 'Importação cancelada'}
+
+
+def _importarTCCs(echo, saveDiff, forcar, etapa):
     s = requests.Session()
-    if(echo):
-        print('Iniciando sessão no portal...')
-    r = s.post('https://www.inf.ufrgs.br/portal/valida.php', data={'loginUsuario': portal['login'], 'senhaUsuario': portal['senha'], 'BtnLogin': '', 'redir': 'painel.php'})
-    if(r.url == 'https://www.inf.ufrgs.br/portal/login.php?action=loginFailed'):
+    estado = carregarSessao(s)
+    r = None
+
+    # A página anterior só serve de referência se os TCCs dela estão no banco
+    anterior = estado if not forcar and os.path.exists(BANCO) else {}
+
+    if(len(s.cookies) > 0):
+        if(echo):
+            print('Reutilizando a sessão no portal...')
+        etapa('pagina')
+        r = baixarPaginaTCCs(s, anterior)
+
+    if(r is None):
+        if(echo):
+            print('Iniciando sessão no portal...')
+        s.cookies.clear()
+        etapa('login')
+        if(not entrarNoPortal(s)):
+            if(echo):
+                print('Login no portal falhou, por favor verifique as credenciais no arquivo credenciais.json')
+            return {'error': 'Login no portal falhou, por favor verifique as credenciais no arquivo credenciais.json'}
+        etapa('pagina')
+        r = baixarPaginaTCCs(s, anterior)
+        if(r is None):
+            return {'error': 'Não foi possível acessar a página de TCCs no portal'}
+
+    # Uma página de erro do portal não é a tabela de TCCs e não pode virar a referência da próxima importação
+    if(r.status_code not in (200, 304)):
+        if(echo):
+            print(f'O portal respondeu com o código {r.status_code} à página de TCCs')
+        return {'error': f'O portal respondeu com o código {r.status_code} à página de TCCs'}
+
+    content = r.text
+    impressao = hashlib.sha1(r.content).hexdigest()
+    if(r.status_code == 304 or impressao == anterior.get('impressao')):
+        salvarSessao(s, estado)
         if(echo):
-            print('Login no portal falhou, por favor verifique as credenciais no arquivo credenciais.json')
-        return {'error': 'Login no portal falhou, por favor verifique as credenciais no arquivo credenciais.json'}
-    else:
-        content = s.get('https://www.inf.ufrgs.br/portal/apps/TCC-Grad/comunica.php').text
+            cprint('Nenhum TCC novo ou atualizado', 'black', 'on_green')
+        return {'success': 'Nenhum TCC novo ou atualizado'}
 
-    parsedTCC = intepretarDados('tcc', 'html', content)
+    etapa('interpretar')
+    parsedTCC = intepretarDados('tcc', 'html', content, progresso=etapa)
     if(echo):
         print('TCCs obtidos com sucesso. \nIninicando interpretação dos dados...')
     
 
-    # Verifica as diferenças entre os dados
-    with open('./data/TCCs.json', 'r+', encoding='utf-8') as f:
-        TCCs_novos = []
-        TCCs_atualizados = []
-
-        f.seek(0)
-        savedTCCs = json.load(f)
-
-        for tcc in parsedTCC:
-            novoTCC = True
-            # Verifica se o TCC é novo ou se teve alterações
-            for savedTCC in savedTCCs:
-                # Verifica se o TCC já está salvo e teve alterações
-                if tcc['Aluno'] == savedTCC['Aluno'] and tcc != savedTCC:
-                    savedTCCs[savedTCCs.index(savedTCC)] = tcc
-                    TCCs_atualizados.append(tcc)
-                    if(echo):
-                        cprint(f'\tTCC atualizado: {tcc["Aluno"]}', 'yellow')
-                    novoTCC = False
-                    break
-                # Verifica se o TCC já está salvo
-                elif tcc['Aluno'] == savedTCC['Aluno']:
-                    novoTCC = False
-                    break
-            
-            # Salva o TCC se for novo
-            if novoTCC:
-                savedTCCs.append(tcc)
-                TCCs_novos.append(tcc)
-                if(echo):
-                    cprint(f'Novo TCC: {tcc["Aluno"]}', 'green')    
-        if(len(TCCs_novos) == 0 and len(TCCs_atualizados) == 0 and echo):
+    # Mescla os TCCs no banco, localizando cada um pela identidade (aluno, curso e semestre)
+    etapa('salvar')
+    banco = abrirBanco()
+    try:
+        alteracoes = mesclarBanco(banco, parsedTCC)
+    finally:
+        banco.close()
+
+    # Guarda a referência da página importada para as próximas execuções
+    estado.update({'impressao': impressao, 'etag': r.headers.get('ETag'), 'modificado': r.headers.get('Last-Modified')})
+    salvarSessao(s, estado)
+
+    TCCs_novos = alteracoes['novos']
+    TCCs_atualizados = [alteracao['tcc'] for alteracao in alteracoes['atualizados']]
+
+    if(echo):
+        for tcc in TCCs_novos:
+            cprint(f'Novo TCC: {tcc["Aluno"]}', 'green')
+        for alteracao in alteracoes['atualizados']:
+            cprint(f'\tTCC atualizado: {alteracao["tcc"]["Aluno"]} ({", ".join(sorted(alteracao["campos"]))})', 'yellow')
+        for tcc in alteracoes['removidos']:
+            cprint(f'\tTCC não encontrado no portal: {tcc["Aluno"]}', 'red')
+
+    if(len(TCCs_novos) == 0 and len(TCCs_atualizados) == 0):
+        if(echo):
             cprint('Nenhum TCC novo ou atualizado', 'black', 'on_green')
-            return {'success': 'Nenhum TCC novo ou atualizado'}
-        else:
-            # Salva os TCCs atualizados
-            f.seek(0)
-            f.truncate()
-            f.write(json.dumps(savedTCCs, ensure_ascii=False, indent=4))
-            if(saveDiff):
-            # Salva os TCCs novos e atualizados
-                with open('./data/TCCs-novos.json', 'r+', encoding='utf-8') as f:
-                    if(f.read() == ''):
-                        f.write(json.dumps(TCCs_novos, ensure_ascii=False, indent=4))
-                    else:
-                        f.seek(0)
-                        TCCs_novos = json.load(f) + TCCs_novos
-                        f.seek(0)
-                        f.truncate()
-                        f.write(json.dumps(TCCs_novos, ensure_ascii=False, indent=4))
-                with open('./data/TCCs_atualizados.json', 'r+', encoding='utf-8') as f:
-                    if(f.read() == ''):
-                        f.write(json.dumps(TCCs_atualizados, ensure_ascii=False, indent=4))
-                    else:
-                        f.seek(0)
-                        TCCs_atualizados = json.load(f) + TCCs_atualizados
-                        f.seek(0)
-                        f.truncate()
-                        f.write(json.dumps(TCCs_atualizados, ensure_ascii=False, indent=4))
-                        
-            if(echo):
-                cprint('TCCs obtidos com sucesso', 'green')
-            return {'success': 'TCCs obtidos com sucesso'}
\ No newline at end of file
+        return {'success': 'Nenhum TCC novo ou atualizado'}
+
+    if(saveDiff):
+        # Salva os TCCs novos e atualizados
+        with open('./data/TCCs-novos.json', 'r+', encoding='utf-8') as f:
+            if(f.read() == ''):
+                f.write(json.dumps(TCCs_novos, ensure_ascii=False, indent=4))
+            else:
+                f.seek(0)
+                TCCs_novos = json.load(f) + TCCs_novos
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(TCCs_novos, ensure_ascii=False, indent=4))
+        with open('./data/TCCs_atualizados.json', 'r+', encoding='utf-8') as f:
+            if(f.read() == ''):
+                f.write(json.dumps(TCCs_atualizados, ensure_ascii=False, indent=4))
+            else:
+                f.seek(0)
+                TCCs_atualizados = json.load(f) + TCCs_atualizados
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(TCCs_atualizados, ensure_ascii=False, indent=4))
+
+    if(echo):
+        cprint('TCCs obtidos com sucesso', 'green')
+    return {'success': 'TCCs obtidos com sucesso'}
\ No newline at end of file
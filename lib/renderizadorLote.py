@@ -0,0 +1,127 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+import datetime
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lib.layout import compilarModelo
+from lib.saida import CONFIGURACAO
+from lib.tcc import imagemFeed, imagemStories
+from lib.tcc.imagemFeed import modeloTCCFeed
+from lib.tcc.imagemStories import modeloTCCStories
+
+
+CURSOS = ['Engenharia de Computação', 'Ciência da Computação']
+
+
+def nomeArquivo(prefixo:str, grupo:list, indice:int, *extras):
+    """
+    Gera o nome do arquivo de uma página a partir do conteúdo do grupo e da sua posição no lote.
+    O mesmo grupo gera sempre o mesmo nome, independente do processo que o renderiza.
+
+    Args:
+        prefixo (str): O prefixo do arquivo, como 'TCC_feed' ou 'TCC_stories'.
+        grupo (list): Os TCCs que compõem a página.
+        indice (int): A posição da página no lote.
+        *extras: Outros valores que alteram a página, como o semestre.
+
+    Returns:
+        str: O caminho do arquivo de saída.
+    """
+    conteudo = json.dumps([grupo, extras], ensure_ascii=False, sort_keys=True)
+    impressao = hashlib.sha1(conteudo.encode('utf-8')).hexdigest()[:8]
+    return f'./output/imagens/{prefixo}_{datetime.date.today()}_{indice}_{impressao}.png'
+
+
+def tarefasTCC(tccs:list, semestre:str, stories = True, feed = False):
+    """
+    Agrupa os TCCs por curso em páginas de feed (2 por página) e de stories (4 por página).
+
+    Args:
+        tccs (list): Os TCCs a serem divulgados.
+        semestre (str): O semestre exibido nos stories.
+        stories (bool): Se devem ser geradas as páginas de stories.
+        feed (bool): Se devem ser geradas as páginas de feed.
+
+    Returns:
+        list: Uma lista de tarefas (modelo, argumentos, arquivo) prontas para renderizarLote.
+    """
+    cursos = [sorted(filter(lambda x: x['Curso'] == curso, tccs), key=lambda x: x['Data']) for curso in CURSOS]
+
+    tarefas = []
+    if(feed):
+        grupos = [c[i:i+2] for c in cursos for i in range(0, len(c), 2)] # Agrupa de 2 em 2
+        for indice, grupo in enumerate(grupos, 1):
+            tarefas.append((modeloTCCFeed, (grupo,), nomeArquivo('TCC_feed', grupo, indice)))
+
+    if(stories):
+        grupos = [c[i:i+4] for c in cursos for i in range(0, len(c), 4)] # Agrupa de 4 em 4
+        for indice, grupo in enumerate(grupos, 1):
+            tarefas.append((modeloTCCStories, (grupo, semestre), nomeArquivo('TCC_stories', grupo, indice, semestre)))
+
+    return tarefas
+
+
+def _iniciarProcesso(configuracao:dict):
+    """
+    Repassa para o processo do lote a configuração de saída do processo principal e compila os modelos
+    uma única vez, antes da primeira página.
+    """
+    CONFIGURACAO.update(configuracao)
+    compilarModelo(imagemFeed.MODELO)
+    compilarModelo(imagemStories.MODELO)
+
+
+def _renderizar(tarefa):
+    """
+    Renderiza uma única tarefa. Executada nos processos do lote.
+    """
+    modelo, args, arquivo = tarefa
+    return modelo(*args, arquivo=arquivo).result()
+
+
+def _resultado(futuro, tarefa):
+    """
+    Converte a gravação de uma página no par (arquivo, erro) informado pelo lote.
+    """
+    erro = futuro.exception()
+    return (tarefa[2] if erro else futuro.result()), erro
+
+
+def renderizarLote(tarefas:list, processos:int = None):
+    """
+    Renderiza as páginas do lote em paralelo, usando um processo por núcleo.
+    Lotes de uma única página, ou com processos=1, são renderizados no próprio processo.
+
+    Args:
+        tarefas (list): As tarefas geradas por tarefasTCC.
+        processos (int, optional): O número máximo de processos. Padrão: o número de núcleos.
+
+    Yields:
+        tuple: (arquivo, erro) para cada página, na ordem em que são gravadas. erro é None em caso de sucesso.
+    """
+    processos = min(processos or os.cpu_count() or 1, len(tarefas))
+
+    if processos <= 1:
+        # A próxima página é renderizada enquanto a anterior é gravada em segundo plano
+        pendentes = {}
+        for modelo, args, arquivo in tarefas:
+            try:
+                pendentes[modelo(*args, arquivo=arquivo)] = (modelo, args, arquivo)
+            except Exception as e:
+                yield arquivo, e
+            for futuro in [f for f in pendentes if f.done()]:
+                yield _resultado(futuro, pendentes.pop(futuro))
+        for futuro in as_completed(pendentes):
+            yield _resultado(futuro, pendentes[futuro])
+        return
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciarProcesso, initargs=(dict(CONFIGURACAO),)) as executor:
+        futuros = {executor.submit(_renderizar, tarefa): tarefa for tarefa in tarefas}
+        for futuro in as_completed(futuros):
+            yield _resultado(futuro, futuros[futuro])
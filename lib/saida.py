@@ -0,0 +1,127 @@
+"""
+DefesaFácil: Solução para criação de imagens de defesas de TCC, mestrado e doutorado
+Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+# Formatos suportados: formato do Pillow, extensão do arquivo e opções padrão de Image.save
+FORMATOS = {
+    'png': ('PNG', '.png', {'compress_level': 3, 'optimize': False}),
+    'webp': ('WEBP', '.webp', {'lossless': True, 'method': 0}),
+    'jpeg': ('JPEG', '.jpg', {'quality': 85}),
+}
+
+# Configuração de saída de cada modelo. Modelos sem configuração usam 'padrao'.
+CONFIGURACAO = {
+    'padrao': {'formato': 'png'},
+    'TCC_feed': {'formato': 'png'},
+    'TCC_stories': {'formato': 'png'},
+    'POS_feed': {'formato': 'png'},
+    'POS_totem': {'formato': 'png'},
+}
+
+_executor = None
+# Gravações ainda não concluídas e as que falharam, até serem recolhidas por aguardarSaida
+_pendentes = set()
+_travaPendentes = threading.Lock()
+
+
+def _reiniciarSaida():
+    """
+    Descarta as threads de saída herdadas em um processo criado por fork, que não existem no processo filho.
+    """
+    global _executor
+    global _travaPendentes
+    _executor = None
+    _pendentes.clear()
+    _travaPendentes = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciarSaida)
+
+
+def configurarSaida(modelo:str, formato:str = 'png', **opcoes):
+    """
+    Define o formato e as opções de codificação das imagens de um modelo.
+
+    Args:
+        modelo (str): O nome do modelo, como 'TCC_stories' ou 'POS_totem'.
+        formato (str): 'png', 'webp' ou 'jpeg'.
+        **opcoes: Opções repassadas para Image.save, como compress_level, optimize, lossless ou quality.
+
+    Exemplo:
+    >>> configurarSaida('POS_totem', 'png', compress_level=1)
+    >>> configurarSaida('TCC_stories', 'jpeg', quality=80)  # Prévias
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato de saída desconhecido: {formato}')
+    CONFIGURACAO[modelo] = {'formato': formato, **opcoes}
+
+
+def _codificar(imagem, arquivo:str, formato:str, opcoes:dict):
+    """
+    Codifica e grava a imagem. Executada nas threads de saída.
+    """
+    if formato == 'JPEG' and imagem.mode != 'RGB':
+        imagem = imagem.convert('RGB')
+    imagem.save(arquivo, formato, **opcoes)
+    return arquivo
+
+
+def salvarImagem(imagem, arquivo:str, modelo:str = 'padrao'):
+    """
+    Grava uma imagem em segundo plano usando o formato configurado para o modelo.
+    A extensão do arquivo é ajustada ao formato. A imagem não deve ser alterada depois de enviada.
+
+    Args:
+        imagem (Image): A imagem renderizada.
+        arquivo (str): O caminho do arquivo de saída.
+        modelo (str): O nome do modelo, para buscar a configuração de saída.
+
+    Returns:
+        Future: Um Future cujo resultado é o caminho do arquivo gravado.
+    """
+    global _executor
+
+    configuracao = dict(CONFIGURACAO.get(modelo, CONFIGURACAO['padrao']))
+    formato, extensao, opcoes = FORMATOS[configuracao.pop('formato')]
+    opcoes = {**opcoes, **configuracao}
+    arquivo = os.path.splitext(arquivo)[0] + extensao
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='saida')
+
+    futuro = _executor.submit(_codificar, imagem, arquivo, formato, opcoes)
+    with _travaPendentes:
+        _pendentes.add(futuro)
+    futuro.add_done_callback(_concluirGravacao)
+    return futuro
+
+
+def _concluirGravacao(futuro):
+    """
+    Descarta as gravações bem-sucedidas. As que falharam ficam pendentes até aguardarSaida informar o erro.
+    """
+    if not futuro.cancelled() and futuro.exception() is None:
+        with _travaPendentes:
+            _pendentes.discard(futuro)
+
+
+def aguardarSaida():
+    """
+    Aguarda a gravação de todas as imagens pendentes.
+
+    Returns:
+        list: Os erros das gravações desde a última chamada, inclusive das que já tinham terminado.
+    """
+    with _travaPendentes:
+        futuros = list(_pendentes)
+    concluidos, _ = wait(futuros)
+
+    with _travaPendentes:
+        _pendentes.difference_update(futuros)
+    return [f.exception() for f in concluidos if not f.cancelled() and f.exception()]
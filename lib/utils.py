@@ -8,9 +8,14 @@ Desenvolvido por Adriel de Souza (adsouza@inf.ufrgs.br)
 """
 
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from collections import OrderedDict
 from enum import Enum
+import bisect
 import json
+import math
+import os
+import weakref
 
 class Alignment(Enum):
     LEFT = 0
@@ -49,22 +54,7 @@ def textBox(text, image_draw, font, box, spacing=0, hAllign = Alignment.LEFT,
     if(showBorders):
         image_draw.rectangle((x, y, x + width, y + height), outline=(255,255,0))
     
-    lines = text.split('\n')
-    true_lines = []
-    for line in lines:
-        if font.getlength(line) + (len(line) * spacing) <= width:
-            true_lines.append(line) 
-        else:
-            current_line = ''
-            for word in line.split(' '):
-                if font.getlength(current_line + word) <= width:
-                    if(len(current_line) > 0):
-                        current_line += ' '
-                    current_line +=  word 
-                else:
-                    true_lines.append(current_line)
-                    current_line = word 
-            true_lines.append(current_line)
+    true_lines, linewidths = quebrarTexto(text, font, width, spacing)
     
     x_offset = y_offset = 0
     lineheight = font.getmetrics()[0] * lineHeight # Give a margin of 0.2x the font height
@@ -75,8 +65,7 @@ def textBox(text, image_draw, font, box, spacing=0, hAllign = Alignment.LEFT,
         y = int(y + height)
         y_offset = - (len(true_lines) * lineheight)
     
-    for line in true_lines:
-        linewidth = font.getlength(line)
+    for line, linewidth in zip(true_lines, linewidths):
         if hAllign == Alignment.CENTER:
             x_offset = (width - linewidth) / 2
         elif hAllign == Alignment.RIGHT:
@@ -90,19 +79,309 @@ def textBox(text, image_draw, font, box, spacing=0, hAllign = Alignment.LEFT,
     
     return (x, y, x + x_offset, y + y_offset)
 
+def quebrarTexto(text, font, width, spacing=0):
+    """
+    Quebra um texto em linhas que caibam na largura informada.
+
+    Cada palavra distinta e o espaço são medidos uma única vez por fonte; a largura das linhas é
+    acumulada a partir dessas medidas, sem montar e medir novamente a linha a cada palavra.
+    Palavras maiores que a largura são divididas entre linhas.
+
+    Parâmetros:
+    - text: O texto a ser quebrado. Quebras de linha existentes são mantidas.
+    - font: A fonte usada para medir o texto.
+    - width: A largura máxima de cada linha.
+    - spacing: O espaçamento entre as letras (padrão: 0).
+
+    Retorna:
+    - Uma tupla com a lista de linhas e a lista com a largura medida de cada linha.
+    """
+    avancos, _, palavras = getGlifos(font)
+
+    espaco = _medirPalavra(font, palavras, ' ')
+    lines = []
+    widths = []
+    for line in text.split('\n'):
+        words = line.split(' ')
+        medidas = [_medirPalavra(font, palavras, word) for word in words]
+        linewidth = sum(medidas) + espaco * (len(words) - 1)
+        if linewidth + (len(line) * spacing) <= width:
+            lines.append(line)
+            widths.append(linewidth)
+            continue
+
+        current_line = []
+        current_width = 0
+        current_len = 0
+        for word, medida in zip(words, medidas):
+            if current_width + medida <= width:
+                if current_len > 0:
+                    current_line.append(' ')
+                    current_width += espaco
+                    current_len += 1
+                current_line.append(word)
+                current_width += medida
+                current_len += len(word)
+                continue
+
+            if current_len > 0:
+                lines.append(''.join(current_line))
+                widths.append(current_width)
+
+            if medida > width:
+                # Divide a palavra em pedaços que caibam na linha; o último continua a linha atual
+                pedacos = _quebrarPalavra(word, font, avancos, width)
+                for pedaco, largura in pedacos[:-1]:
+                    lines.append(pedaco)
+                    widths.append(largura)
+                word, medida = pedacos[-1]
+
+            current_line = [word]
+            current_width = medida
+            current_len = len(word)
+        lines.append(''.join(current_line))
+        widths.append(current_width)
+
+    return lines, widths
+
+def truncarTexto(text, font, width, manterInicio=0, manterFim=1):
+    """
+    Limita o tamanho de um texto removendo palavras do meio, da penúltima para a primeira, até que ele caiba
+    na largura informada. As larguras dos prefixos são calculadas uma única vez e a maior forma que cabe é
+    encontrada por busca binária.
+
+    Parâmetros:
+    - text: O texto a ser limitado, como um nome completo.
+    - font: A fonte usada para medir o texto.
+    - width: A largura máxima do texto.
+    - manterInicio: Quantidade de palavras iniciais que nunca são removidas (padrão: 0).
+    - manterFim: Quantidade de palavras finais que nunca são removidas (padrão: 1, o último sobrenome).
+
+    Retorna:
+    - O texto com as palavras do meio removidas, ou o próprio texto se ele já couber.
+
+    Exemplo:
+    >>> truncarTexto('João Pedro de Oliveira Santos', font, 200)
+    'João Pedro Santos'
+    """
+    words = text.split(' ')
+    if len(words) <= manterInicio + manterFim:
+        return text
+
+    palavras = getGlifos(font)[2]
+    espaco = _medirPalavra(font, palavras, ' ')
+    medidas = [_medirPalavra(font, palavras, word) for word in words]
+
+    fim = len(words) - manterFim
+    larguraFim = sum(medidas[fim:]) + espaco * max(manterFim - 1, 0)
+
+    # larguras[i] é a largura do texto mantendo as primeiras (manterInicio + i) palavras
+    larguras = []
+    prefixo = 0
+    for k in range(fim + 1):
+        if k >= manterInicio:
+            larguras.append(prefixo + (espaco if k > 0 and manterFim > 0 else 0) + larguraFim)
+        if k < fim:
+            prefixo += medidas[k] + (espaco if k > 0 else 0)
+
+    if larguras[-1] <= width:
+        return text
+
+    k = max(bisect.bisect_right(larguras, width) - 1, 0) + manterInicio
+    return ' '.join(words[:k] + words[fim:])
+
+def _medirPalavra(font, palavras, word):
+    """
+    Retorna a largura de uma palavra, medindo-a apenas na primeira vez.
+    """
+    largura = palavras.get(word)
+    if largura is None:
+        largura = palavras[word] = font.getlength(word)
+    return largura
+
+def _quebrarPalavra(word, font, avancos, width):
+    """
+    Divide uma palavra em pedaços que caibam na largura informada, retornando pares (pedaço, largura).
+    """
+    pedacos = []
+    inicio = 0
+    largura = 0
+    for i, char in enumerate(word):
+        avanco = avancos.get(char)
+        if avanco is None:
+            avanco = avancos[char] = font.getlength(char)
+        if largura + avanco > width and i > inicio:
+            pedacos.append((word[inicio:i], largura))
+            inicio = i
+            largura = 0
+        largura += avanco
+    pedacos.append((word[inicio:], largura))
+    return pedacos
+
+# Avanços, bitmaps dos glifos e larguras de palavras já medidos, por fonte
+_glifos = weakref.WeakKeyDictionary()
+
+def getGlifos(font):
+    """
+    Retorna o cache de glifos de uma fonte.
+
+    Parâmetros:
+    font (ImageFont): A fonte.
+
+    Retorna:
+    tuple: Dicionários (avanços, máscaras, palavras). Os avanços são indexados pelo caractere, as máscaras
+    por (caractere, modo, fração x, fração y), junto com o deslocamento retornado por getmask2, e as
+    larguras das palavras pela própria palavra.
+    """
+    glifos = _glifos.get(font)
+    if glifos is None:
+        glifos = _glifos[font] = ({}, {}, {})
+    return glifos
+
+def _glifosDiretos(ctx):
+    """
+    Verifica se o ImageDraw tem os métodos internos usados por drawText para compor os glifos.
+    """
+    return hasattr(ctx, '_getink') and hasattr(getattr(ctx, 'draw', None), 'draw_bitmap')
+
 def drawText(ctx, text, pos, font, spacing, **kwargs):
+    """
+    Desenha um texto caractere a caractere, aplicando o espaçamento entre letras.
+
+    O bitmap de cada glifo é renderizado uma única vez por fonte e posição subpixel e depois apenas
+    composto na imagem, produzindo os mesmos pixels que chamar ImageDraw.text para cada caractere.
+
+    Parâmetros:
+    - ctx: O objeto ImageDraw usado para desenhar na imagem.
+    - text: O texto a ser desenhado (sem quebras de linha).
+    - pos: A posição (x, y) do início do texto.
+    - font: A fonte a ser usada.
+    - spacing: O espaçamento adicional entre as letras.
+    - **kwargs: Outros argumentos a serem passados para ImageDraw.text.
+    """
+    avancos, mascaras, _ = getGlifos(font)
     for char in text:
-        ctx.text(pos, char, font=font, **kwargs)
-        width = font.getlength(char) + spacing
-        pos = (pos[0]+width, pos[1])
+        if char not in avancos:
+            avancos[char] = font.getlength(char)
 
-def getFont(name, fontSize=20):
+    # Argumentos além da cor mudam a renderização; nesse caso desenha cada caractere com o ImageDraw.
+    # O caminho rápido usa ImageDraw._getink e ImageDraw.draw.draw_bitmap, que não são API pública do Pillow:
+    # a versão está fixada em requirements.txt e, se eles não existirem, o ImageDraw é usado.
+    if not set(kwargs) <= {'fill'} or ctx.fontmode not in ('1', 'L') or not _glifosDiretos(ctx):
+        for char in text:
+            ctx.text(pos, char, font=font, **kwargs)
+            pos = (pos[0] + avancos[char] + spacing, pos[1])
+        return
+
+    ink, fill = ctx._getink(kwargs.get('fill'))
+    if ink is None:
+        ink = fill
+    if ink is None:
+        return
+
+    x, y = pos
+    for char in text:
+        if char != '\n':
+            chave = (char, ctx.fontmode, math.modf(x)[0], math.modf(y)[0])
+            glifo = mascaras.get(chave)
+            if glifo is None:
+                glifo = mascaras[chave] = font.getmask2(char, ctx.fontmode, start=chave[2:])
+            mask, offset = glifo
+            ctx.draw.draw_bitmap((int(x) + offset[0], int(y) + offset[1]), mask, ink)
+        x += avancos[char] + spacing
+
+class RegistroFontes:
+    """
+    Registro das fontes já carregadas pelo processo, com descarte LRU.
+
+    As fontes são indexadas por (arquivo da família, tamanho, layout engine), de modo que
+    cada combinação é lida do disco pelo FreeType uma única vez enquanto estiver no registro.
+    Quando a capacidade é excedida, a fonte usada há mais tempo é descartada.
+
+    Atributos:
+    - capacidade (int): Número máximo de fontes mantidas em memória.
+    - acertos (int): Quantidade de buscas atendidas pelo registro.
+    - falhas (int): Quantidade de buscas que precisaram carregar a fonte do disco.
+    - descartes (int): Quantidade de fontes removidas por exceder a capacidade.
+    """
+
+    def __init__(self, capacidade=32):
+        self.capacidade = capacidade
+        self._fontes = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def obter(self, name, fontSize=20, layout_engine=None):
+        """
+        Retorna a fonte do registro, carregando-a do disco se necessário.
+
+        Parâmetros:
+        name (str): O nome do arquivo de fonte, relativo a ./assets/fonts.
+        fontSize (int): O tamanho da fonte.
+        layout_engine (ImageFont.Layout): O layout engine a ser usado (padrão: o do Pillow).
+
+        Retorna:
+        ImageFont: A fonte de texto carregada.
+        """
+        chave = (name, fontSize, layout_engine)
+        fonte = self._fontes.get(chave)
+        if fonte is not None:
+            self.acertos += 1
+            self._fontes.move_to_end(chave)
+            return fonte
+
+        self.falhas += 1
+        fonte = ImageFont.truetype(f"./assets/fonts/{name}", fontSize, layout_engine=layout_engine)
+        self._fontes[chave] = fonte
+        if len(self._fontes) > self.capacidade:
+            self._fontes.popitem(last=False)
+            self.descartes += 1
+        return fonte
+
+    def precarregar(self, fontes):
+        """
+        Carrega antecipadamente as fontes informadas.
+
+        Parâmetros:
+        fontes (list): Lista de tuplas (nome, tamanho) ou (nome, tamanho, layout engine).
+        """
+        for fonte in fontes:
+            self.obter(*fonte)
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do registro.
+
+        Retorna:
+        dict: Um dicionário com as chaves 'acertos', 'falhas', 'descartes' e 'fontes' (fontes em memória).
+        """
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'descartes': self.descartes,
+            'fontes': len(self._fontes)
+        }
+
+    def limpar(self):
+        """
+        Remove todas as fontes do registro e zera os contadores.
+        """
+        self._fontes.clear()
+        self.acertos = self.falhas = self.descartes = 0
+
+
+registroFontes = RegistroFontes()
+
+def getFont(name, fontSize=20, layout_engine=None):
     """
     Retorna uma fonte de texto com o nome e tamanho especificados.
+    A fonte é obtida do registro de fontes do processo, sendo carregada do disco apenas na primeira vez.
 
     Parâmetros:
     name (str): O nome do arquivo de fonte.
     fontSize (int): O tamanho da fonte.
+    layout_engine (ImageFont.Layout): O layout engine a ser usado (padrão: o do Pillow).
 
     Retorna:
     ImageFont: A fonte de texto carregada.
@@ -111,7 +390,76 @@ def getFont(name, fontSize=20):
     >>> getFont("Arial.ttf", 12)
     <PIL.ImageFont.FreeTypeFont object at ...>
     """
-    return ImageFont.truetype(f"./assets/fonts/{name}", fontSize)
+    return registroFontes.obter(name, fontSize, layout_engine)
+
+def precarregarFontes(fontes):
+    """
+    Carrega antecipadamente no registro as fontes usadas por um modelo.
+
+    Parâmetros:
+    fontes (list): Lista de tuplas (nome, tamanho).
+    """
+    registroFontes.precarregar(fontes)
+
+# Cache dos ícones já redimensionados, indexado por (caminho, caixa)
+_icones = {}
+
+def getIcone(name, box):
+    """
+    Retorna um ícone redimensionado para caber na caixa informada, junto com sua máscara alfa.
+    O ícone é decodificado e redimensionado apenas na primeira vez, sendo recarregado se o arquivo for alterado.
+
+    Parâmetros:
+    name (str): O nome do arquivo do ícone, relativo a ./assets/img.
+    box (tuple): A caixa (largura, altura) em que o ícone deve caber, como em ImageOps.contain.
+
+    Retorna:
+    tuple: O ícone em RGBA e sua máscara alfa, prontos para Image.paste.
+
+    Exemplo:
+    >>> icon, mask = getIcone('seta.png', (25, 25))
+    >>> img.paste(icon, pos, mask=mask)
+    """
+    caminho = f'./assets/img/{name}'
+    chave = (caminho, tuple(box))
+    mtime = os.stat(caminho).st_mtime_ns
+
+    icone = _icones.get(chave)
+    if icone is None or icone[0] != mtime:
+        with Image.open(caminho) as arquivo:
+            sprite = ImageOps.contain(arquivo.convert('RGBA'), box)
+        icone = (mtime, sprite, sprite.getchannel('A'))
+        _icones[chave] = icone
+
+    return icone[1], icone[2]
+
+
+# Imagens de fundo já decodificadas, indexadas pelo caminho
+_fundos = {}
+
+def getFundo(name):
+    """
+    Retorna uma cópia da imagem de fundo de um modelo.
+    O arquivo é decodificado apenas na primeira vez; a imagem original fica intacta em memória
+    e cada chamada recebe uma cópia própria para desenhar.
+
+    Parâmetros:
+    name (str): O nome do arquivo de fundo, relativo a ./assets/img.
+
+    Retorna:
+    Image: Uma cópia da imagem de fundo.
+
+    Exemplo:
+    >>> imagem = getFundo('tcc/fundo-stories.png')
+    """
+    caminho = f'./assets/img/{name}'
+    fundo = _fundos.get(caminho)
+    if fundo is None:
+        with Image.open(caminho) as arquivo:
+            fundo = arquivo.copy()
+        _fundos[caminho] = fundo
+
+    return fundo.copy()
 
 
 def get_credentials(scope:str):